@@ -3,12 +3,12 @@ import shutil
 from app.services.ai.client import groq_client
 from agents.common import config, testing
 
-def query_groq(prompt: str) -> str:
-    """Sends a prompt to Groq and returns the response."""
+def query_groq(prompt: str, model: str = None) -> str:
+    """Sends a prompt to Groq and returns the response (large model unless `model` is given)."""
     try:
         response = groq_client.get_client().chat.completions.create(
             messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
+            model=model or groq_client.text_model,
             temperature=0.1
         )
         return response.choices[0].message.content
@@ -18,8 +18,8 @@ def run_agent():
     lists = tasks_service.get_task_lists()
     list_id = None
     for l in lists:
-        if l['title'] == TARGET_LIST_NAME:
-            list_id = l['id']
+        if l.title == TARGET_LIST_NAME:
+            list_id = l.id
             break
     
     if not list_id:
@@ -37,15 +37,15 @@ def run_agent():
                 print("💤 No new tasks... sleeping.")
             else:
                 for task in tasks:
-                    print(f"\n⚡️ ACTION REQUIRED: {task['title']}")
-                    print(f"   Notes: {task.get('notes', 'No notes')}")
+                    print(f"\n⚡️ ACTION REQUIRED: {task.title}")
+                    print(f"   Notes: {task.notes or 'No notes'}")
                     
                     # Simulation of work
                     print("   🔨 Asking generic AI to fix this...")
                     time.sleep(2) 
                     
                     print("   ✅ Done! Marking as completed.")
-                    tasks_service.complete_task(task['id'], tasklist_id=list_id)
+                    tasks_service.complete_task(task.id, tasklist_id=list_id)
             
             time.sleep(10) # Check every 10 seconds
 
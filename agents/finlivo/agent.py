@@ -21,7 +21,7 @@ class FinLivoAgent:
         # Find List ID
         try:
             lists = tasks_service.get_task_lists()
-            self.list_id = next((l['id'] for l in lists if l['title'] == config.LIST_NAME), None)
+            self.list_id = next((l.id for l in lists if l.title == config.LIST_NAME), None)
             if not self.list_id:
                 print(f"❌ List '{config.LIST_NAME}' not found.")
                 return
@@ -34,13 +34,10 @@ class FinLivoAgent:
     def loop(self):
         while True:
             try:
-                tasks = tasks_service.get_tasks(tasklist_id=self.list_id)
-                if tasks:
-                    for task in tasks:
-                        self.process_task(task)
-                    time.sleep(10)
-                else:
-                    time.sleep(10)
+                # Pages are fetched lazily as tasks are processed
+                for task in tasks_service.iter_tasks(tasklist_id=self.list_id):
+                    self.process_task(task)
+                time.sleep(10)
             except KeyboardInterrupt:
                 print("\n🛑 Agent stopped.")
                 knowledge.update_knowledge_base(
@@ -54,12 +51,12 @@ class FinLivoAgent:
                 time.sleep(10)
 
     def process_task(self, task):
-        title = task['title']
+        title = task.title
         if title.startswith("[FAILED]"):
             print(f"   ⏭️ Skipping failed task: {title}")
             return
 
-        notes = task.get('notes', '')
+        notes = task.notes
         print(f"\n⚡️ TASK: {title}")
         
         # Find File
@@ -78,11 +75,11 @@ class FinLivoAgent:
             print(f"   {result}")
             
             if "✅" in result:
-                tasks_service.complete_task(task['id'], tasklist_id=self.list_id)
+                tasks_service.complete_task(task.id, tasklist_id=self.list_id)
             else:
                 # Failure Case: Rename task so we don't pick it up again
                 new_title = f"[FAILED] {title}"
-                tasks_service.update_task_title(task['id'], new_title, tasklist_id=self.list_id)
+                tasks_service.update_task_title(task.id, new_title, tasklist_id=self.list_id)
                 print(f"   ⚠️ Marked task as FAILED in Google Tasks.")
         else:
             print(f"   🤔 No valid file found for task. mention filename in title/notes.")
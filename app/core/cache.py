@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from app.core.metrics import metrics
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    etag: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    Expired entries are kept (until evicted) so callers can revalidate them
+    with their ETag instead of downloading the resource again.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = metrics.counter(f"{name}_cache_hits_total", f"{name} cache hits")
+        self.misses = metrics.counter(f"{name}_cache_misses_total", f"{name} cache misses")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value if it is still fresh, otherwise None."""
+        entry = self.get_entry(key)
+        if entry is not None and entry.fresh:
+            self.hits.inc()
+            return entry.value
+        self.misses.inc()
+        return None
+
+    def get_entry(self, key) -> CacheEntry | None:
+        """Returns the entry even if it has expired (no hit/miss accounting)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, etag: str = None, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = CacheEntry(value, expires_at, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def touch(self, key):
+        """Marks an entry fresh again (e.g. after a 304 Not Modified)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -9,8 +9,65 @@ class Settings(BaseSettings):
     # Cloud Deployment (Inject JSON content directly)
     GOOGLE_CREDENTIALS_JSON: str | None = None
     GOOGLE_TOKEN_JSON: str | None = None
+
+    # Where refreshed tokens are written back: "file", "memory" or "none"
+    GOOGLE_TOKEN_STORE: str = "file"
+    GOOGLE_TOKEN_STORE_PATH: str | None = None
+    GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
     
     GROQ_API_KEY: str | None = None
+    # Extra keys (comma-separated); calls go to the key with the most rate-limit headroom
+    GROQ_API_KEYS: str | None = None
+    # Groq request limits
+    GROQ_MAX_CONCURRENCY: int = 8
+    GROQ_TIMEOUT_SECONDS: float = 30.0
+    GROQ_SMALL_MODEL: str = "llama-3.1-8b-instant"
+    GROQ_LARGE_MODEL: str = "llama-3.3-70b-versatile"
+    # Used while the large model's circuit breaker is open or it keeps failing (off when unset)
+    GROQ_FALLBACK_MODEL: str | None = None
+    GROQ_LATENCY_BUDGET_SECONDS: float = 10.0
+    GROQ_HEDGE_MIN_DELAY_SECONDS: float = 1.5
+    GROQ_BREAKER_FAILURES: int = 5
+    GROQ_BREAKER_RESET_SECONDS: int = 30
+    GROQ_AUDIO_MODEL: str = "distil-whisper-large-v3-en"
+    GROQ_BASE_URL: str | None = None
+
+    # Voice notes: language hint for Whisper (empty = auto-detect) and chunking of long notes (needs ffmpeg)
+    WHISPER_LANGUAGE: str | None = "en"
+    VOICE_CHUNK_MIN_SECONDS: int = 60
+    VOICE_CHUNK_SECONDS: int = 30
+    VOICE_CHUNK_MAX_SECONDS: int = 45
+    VOICE_CHUNK_CONCURRENCY: int = 4
+
+    # parse_event response cache (AI_CACHE_PATH enables a SQLite copy that survives restarts)
+    AI_CACHE_TTL: int = 21600
+    AI_CACHE_MAX_SIZE: int = 1000
+    AI_CACHE_PATH: str | None = None
+
+    # Rule-based parser tried before the LLM for simple phrases
+    LOCAL_PARSER_ENABLED: bool = True
+    LOCAL_PARSER_MIN_CONFIDENCE: float = 0.8
+    LOCAL_PARSER_FALLBACK_MIN_CONFIDENCE: float = 0.5
+
+    USER_TIMEZONE: str = "Asia/Dushanbe"
+
+    # Google API Concurrency
+    GOOGLE_API_THREADS: int = 8
+    CALENDAR_MAX_CONCURRENCY: int = 4
+    TASKS_MAX_CONCURRENCY: int = 4
+
+    # Google API Quotas (requests per second) & Retries
+    CALENDAR_API_QPS: float = 10.0
+    TASKS_API_QPS: float = 5.0
+    GOOGLE_API_MAX_RETRIES: int = 5
+
+    # Caching
+    TASK_LISTS_CACHE_TTL: int = 300
+    CALENDAR_LIST_CACHE_TTL: int = 3600
+    AGENDA_CACHE_TTL: int = 300
+    AGENDA_PAGE_SIZE: int = 10
+    FREEBUSY_CACHE_TTL: int = 600
+    CALENDAR_SYNC_LOOKAHEAD_DAYS: int = 90
     
     # Webhook Settings
     WEBHOOK_URL: str | None = None
@@ -18,6 +75,21 @@ class Settings(BaseSettings):
     WEBHOOK_HOST: str = "0.0.0.0"
     WEBHOOK_PORT: int = 8080
 
+    # Google Calendar Push Notifications (events.watch)
+    GOOGLE_PUSH_ENABLED: bool = True
+    GOOGLE_PUSH_PATH: str = "/google/notifications"
+    GOOGLE_PUSH_SECRET: str | None = None
+    GOOGLE_PUSH_CHANNEL_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Background Update Processing
+    UPDATE_WORKERS: int = 4
+    UPDATE_QUEUE_SIZE: int = 100
+
+    # Duplicate Update Filtering
+    DEDUP_TTL_SECONDS: int = 600
+    DEDUP_MAX_SIZE: int = 10000
+    DEDUP_REDIS_URL: str | None = None
+
     class Config:
         env_file = ".env"
 
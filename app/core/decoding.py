@@ -0,0 +1,11 @@
+from aiogram import Bot, types
+
+def decode_update(body: bytes, bot: Bot) -> types.Update:
+    """
+    Decodes a raw webhook body into an Update in a single pass.
+
+    pydantic-core parses the JSON bytes and validates them directly into the
+    model, and binding the bot here saves Dispatcher.feed_update from
+    re-creating the whole update (model_dump + validate) to mount it.
+    """
+    return types.Update.model_validate_json(body, context={"bot": bot})
@@ -0,0 +1,97 @@
+import logging
+import time
+from collections import OrderedDict
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+duplicates_dropped = metrics.counter("update_duplicates_dropped_total", "Redelivered Telegram updates that were skipped")
+
+class MemoryDedupBackend:
+    """Fixed-size LRU of recently seen keys with a TTL."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._seen = OrderedDict()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def add_if_new(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        expires_at = self._seen.get(key)
+        if expires_at is not None and expires_at > now:
+            self._seen.move_to_end(key)
+            return False
+
+        self._seen[key] = now + ttl
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+
+    def discard(self, key: str):
+        self._seen.pop(key, None)
+
+class RedisDedupBackend:
+    """Shared backend so several instances drop each other's duplicates (requires `redis`)."""
+
+    def __init__(self, url: str, prefix: str = "tg:update:"):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.prefix = prefix
+
+    async def add_if_new(self, key: str, ttl: float) -> bool:
+        return bool(await self.client.set(self.prefix + key, 1, nx=True, ex=max(1, int(ttl))))
+
+    async def discard(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+class UpdateDeduplicator:
+    """
+    Remembers recent update_ids so Telegram redeliveries are processed once.
+
+    is_duplicate() claims the update; call forget() if it is then not
+    accepted, so Telegram's redelivery is not mistaken for a duplicate.
+    """
+
+    def __init__(self, ttl: float = 600, max_size: int = 10000, shared_backend=None):
+        self.ttl = ttl
+        self.local = MemoryDedupBackend(max_size)
+        self.shared = shared_backend
+
+    async def is_duplicate(self, update_id: int) -> bool:
+        key = str(update_id)
+        if not self.local.add_if_new(key, self.ttl):
+            duplicates_dropped.inc()
+            return True
+
+        if self.shared is not None:
+            try:
+                if not await self.shared.add_if_new(key, self.ttl):
+                    duplicates_dropped.inc()
+                    return True
+            except Exception as e:
+                # Never lose an update because the shared store is down
+                logger.error(f"Dedup backend error: {e}")
+        return False
+
+    async def forget(self, update_id: int):
+        key = str(update_id)
+        self.local.discard(key)
+        if self.shared is not None:
+            try:
+                await self.shared.discard(key)
+            except Exception as e:
+                logger.error(f"Dedup backend error: {e}")
+
+def create_deduplicator(ttl: float, max_size: int, redis_url: str | None = None) -> UpdateDeduplicator:
+    shared = None
+    if redis_url:
+        try:
+            shared = RedisDedupBackend(redis_url)
+            logger.info("✅ Shared update dedup backend enabled")
+        except ImportError:
+            logger.warning("⚠️ DEDUP_REDIS_URL is set but `redis` is not installed. Using local dedup only.")
+    return UpdateDeduplicator(ttl=ttl, max_size=max_size, shared_backend=shared)
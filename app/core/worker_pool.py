@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from aiogram import Bot, Dispatcher, types
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+queue_depth = metrics.gauge("update_queue_depth", "Updates waiting to be handled")
+queue_wait = metrics.summary("update_queue_wait_seconds", "Time an update waited before a worker picked it up")
+processing_time = metrics.summary("update_processing_seconds", "Time spent handling an update")
+rejected_updates = metrics.counter("update_queue_rejected_total", "Updates dropped because the queue was full")
+
+def get_chat_key(update: types.Update) -> int:
+    """Returns the id used to keep updates of one conversation in order."""
+    event = update.event
+    chat = getattr(event, "chat", None)
+    if chat is None and getattr(event, "message", None) is not None:
+        chat = getattr(event.message, "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    return update.update_id
+
+class UpdateWorkerPool:
+    """
+    Processes Telegram updates in the background.
+
+    Every chat has its own backlog and at most one worker handles a chat at a
+    time, so updates from one chat are handled in order. Workers take the next
+    chat that has work from a shared queue, so a slow update only holds up
+    later updates of its own chat while `workers` chats run in parallel.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, workers: int = 4, max_queue_size: int = 100):
+        self.dp = dp
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.max_queue_size = max_queue_size
+        # chat key -> deque of (enqueued_at, update); a key is present while the chat has work
+        self._backlogs = {}
+        self._ready = None
+        self._tasks = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def depth(self) -> int:
+        return sum(len(backlog) for backlog in self._backlogs.values())
+
+    def start(self):
+        if self.running:
+            return
+        # Holds each chat with work at most once, so no two workers pick the same chat
+        self._ready = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"update-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"🧵 Started {self.workers} update workers")
+
+    async def stop(self, timeout: float = 10.0):
+        """Waits for queued updates to finish, then cancels the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ {self.depth()} updates still queued at shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._backlogs = {}
+        self._ready = None
+
+    def submit(self, update: types.Update) -> bool:
+        """Enqueues an update without waiting. Returns False if the queue is full."""
+        if not self.running:
+            self.start()
+        if self.depth() >= self.max_queue_size:
+            rejected_updates.inc()
+            logger.warning(f"⚠️ Update queue full, dropping update {update.update_id}")
+            return False
+        key = get_chat_key(update)
+        backlog = self._backlogs.get(key)
+        if backlog is None:
+            # Chat is idle: schedule it; otherwise the worker handling it picks this up next
+            backlog = self._backlogs[key] = deque()
+            self._ready.put_nowait(key)
+        backlog.append((time.monotonic(), update))
+        queue_depth.set(self.depth())
+        return True
+
+    async def _worker(self, index: int):
+        while True:
+            key = await self._ready.get()
+            backlog = self._backlogs[key]
+            enqueued_at, update = backlog.popleft()
+            queue_wait.observe(time.monotonic() - enqueued_at)
+            queue_depth.set(self.depth())
+            try:
+                with processing_time.time():
+                    await self.dp.feed_update(self.bot, update)
+            except Exception as e:
+                logger.error(f"Update {update.update_id} failed in worker {index}: {e}")
+            finally:
+                if backlog:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._backlogs[key]
+                self._ready.task_done()
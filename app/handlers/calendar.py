@@ -1,24 +1,49 @@
+import html
 from aiogram import Router, types, F
-from app.services.calendar.service import calendar_service
+from aiogram.exceptions import TelegramBadRequest
+from app.keyboards import get_agenda_keyboard
+from app.services.calendar.agenda import agenda_engine, format_event_time, WINDOWS, AgendaPage
 
 router = Router()
 
+def render_agenda(agenda: AgendaPage) -> str:
+    title = WINDOWS[agenda.window]
+    if not agenda.events:
+        return f"📅 <b>{title}:</b> no events."
+
+    text = f"📅 <b>{title}:</b>\n\n"
+    for event in agenda.events:
+        calendar_name = agenda.calendar_names.get(event.calendar_id)
+        suffix = f" <i>({html.escape(calendar_name)})</i>" if calendar_name else ""
+        text += f"• <b>{format_event_time(event, agenda_engine.tz)}</b>: {html.escape(event.summary)}{suffix}\n"
+    return text
+
 @router.message(F.text == "📅 Agenda")
 async def handle_agenda(message: types.Message):
     try:
-        events = calendar_service.list_events(max_results=10)
-        if not events:
-            await message.answer("📅 No upcoming events found.")
-            return
-
-        text = "📅 **Upcoming Events:**\n\n"
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            summary = event.get('summary', 'No Title')
-            # Simple format cleanup
-            clean_time = start.replace('T', ' ').split('+')[0]
-            text += f"• <b>{clean_time}</b>: {summary}\n"
-        
-        await message.answer(text, parse_mode="HTML")
+        agenda = await agenda_engine.get_page('week', refresh=True)
+        keyboard = get_agenda_keyboard(agenda.window, agenda.page, agenda.total_pages, WINDOWS)
+        await message.answer(render_agenda(agenda), reply_markup=keyboard, parse_mode="HTML")
     except Exception as e:
         await message.answer(f"❌ Error fetching agenda: {e}")
+
+@router.callback_query(F.data.startswith("agenda:"))
+async def handle_agenda_page(callback_query: types.CallbackQuery):
+    """Switches window or page; later pages are served from the agenda cache."""
+    parts = callback_query.data.split(":")
+    if len(parts) != 3 or parts[1] not in WINDOWS:
+        await callback_query.answer()
+        return
+
+    try:
+        window, page = parts[1], int(parts[2])
+        agenda = await agenda_engine.get_page(window, page)
+        keyboard = get_agenda_keyboard(agenda.window, agenda.page, agenda.total_pages, WINDOWS)
+        await callback_query.message.edit_text(render_agenda(agenda), reply_markup=keyboard, parse_mode="HTML")
+    except TelegramBadRequest as e:
+        # Same page pressed twice; anything else (e.g. "can't parse entities") is a real failure
+        if "message is not modified" not in str(e):
+            await callback_query.message.edit_text(f"❌ Error fetching agenda: {e}")
+    except Exception as e:
+        await callback_query.message.edit_text(f"❌ Error fetching agenda: {e}")
+    await callback_query.answer()
@@ -1,19 +1,38 @@
 from aiogram import Router, types, F
-from app.services.tasks.service import tasks_service
-from app.services.ai.service import ai_service
-from app.services.calendar.service import calendar_service
+from app.services.tasks.service import async_tasks_service
+from app.services.ai.service import ai_service, SupersededError
+from app.services.calendar.service import async_calendar_service
 from app.keyboards import get_main_menu, get_confirm_keyboard, get_project_selection_keyboard
+from app.core import config
+from zoneinfo import ZoneInfo
+import asyncio
 import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
 # Simple in-memory state: {user_id: {"state": str, "data": dict}}
 USER_STATE = {}
 
+# Reply-keyboard buttons answered by their own handlers, never by the LLM
+MENU_TEXTS = {"📅 Agenda", "➕ New task", "🔄 Refresh Lists", "🔙 Back"}
+WIZARD_STATES = {"CHOOSING_PROJECT", "WAITING_FOR_TASK"}
+
+def will_parse(message: types.Message) -> bool:
+    """True if the message goes to the LLM: a voice note, or free text outside the task wizard."""
+    if message.voice:
+        return True
+    text = message.text
+    if not text or text.startswith("/") or text in MENU_TEXTS:
+        return False
+    return USER_STATE.get(message.from_user.id, {}).get("state") not in WIZARD_STATES
+
 @router.message(F.text == "➕ New task")
 async def handle_new_task_wizard(message: types.Message):
     try:
-        lists = tasks_service.get_task_lists()
+        lists = await async_tasks_service.get_task_lists()
         # Build Keyboard with Project Names using helper
         keyboard = get_main_menu() # Fallback? No, we need custom reply keyboard for lists.
         
@@ -22,7 +41,7 @@ async def handle_new_task_wizard(message: types.Message):
         kb_rows = []
         row = []
         for l in lists:
-            row.append(types.KeyboardButton(text=l['title']))
+            row.append(types.KeyboardButton(text=l.title))
             if len(row) == 2:
                 kb_rows.append(row)
                 row = []
@@ -50,9 +69,10 @@ async def handle_back(message: types.Message):
 @router.message(F.text == "🔄 Refresh Lists")
 async def handle_refresh(message: types.Message):
     try:
-        lists = tasks_service.get_task_lists()
+        await async_tasks_service.invalidate_task_lists()
+        lists = await async_tasks_service.get_task_lists()
         count = len(lists)
-        names = ", ".join([l['title'] for l in lists])
+        names = ", ".join([l.title for l in lists])
         await message.answer(f"✅ **Lists Refreshed!**\nFound {count} lists:\n{names}", parse_mode="Markdown")
     except Exception as e:
         await message.answer(f"❌ Error: {e}")
@@ -88,7 +108,7 @@ async def process_project_selection(callback_query: types.CallbackQuery):
     await callback_query.message.edit_text(f"⏳ Saving '{task_title}'...")
     
     try:
-        tasks_service.create_task(title=task_title, notes="", tasklist_id=list_id)
+        await async_tasks_service.create_task(title=task_title, notes="", tasklist_id=list_id)
         await callback_query.message.edit_text(f"✅ Saved <b>{task_title}</b> to Project!", parse_mode="HTML")
     except Exception as e:
         await callback_query.message.edit_text(f"❌ Error creating task: {e}")
@@ -118,13 +138,14 @@ async def process_event_confirmation(callback_query: types.CallbackQuery):
             start_dt = datetime.datetime.fromisoformat(event_data['start'])
             end_dt = datetime.datetime.fromisoformat(event_data['end'])
             
-            link = calendar_service.create_event(
+            link = await async_calendar_service.create_event(
                 summary=event_data['summary'],
                 start_time=start_dt,
                 end_time=end_dt,
                 description=event_data.get('description', ''),
                 recurrence=event_data.get('recurrence'),
-                reminders=event_data.get('reminders')
+                reminders=event_data.get('reminders'),
+                user_id=user_id
             )
             
             del USER_STATE[user_id]
@@ -136,6 +157,132 @@ async def process_event_confirmation(callback_query: types.CallbackQuery):
             await callback_query.message.edit_text(f"❌ Error: {e}")
 
 
+async def describe_conflicts(user_id: int, event_data: dict) -> str:
+    """Returns a warning block listing busy times the proposed event overlaps (empty if none)."""
+    try:
+        start_dt = datetime.datetime.fromisoformat(event_data['start'])
+        end_dt = datetime.datetime.fromisoformat(event_data['end'])
+        conflicts = await async_calendar_service.find_conflicts(start_dt, end_dt, user_id=user_id)
+    except Exception as e:
+        logger.warning(f"Conflict check failed: {e}")
+        return ""
+
+    if not conflicts:
+        return ""
+    tz = ZoneInfo(config.settings.USER_TIMEZONE)
+    lines = [
+        f"• {busy_start.astimezone(tz):%a %d %b %H:%M}–{busy_end.astimezone(tz):%H:%M}"
+        for busy_start, busy_end in conflicts
+    ]
+    return "⚠️ **Conflicts with busy time:**\n" + "\n".join(lines) + "\n\n"
+
+def guess_note(items: list) -> str:
+    """Warns that the intents are the local parser's guess because the AI was unavailable (empty otherwise)."""
+    if any(item.get('guessed') for item in items):
+        return "🤔 AI is unavailable, so this is my best guess. Please check it.\n\n"
+    return ""
+
+def describe_intent(item: dict) -> str:
+    """One line per parsed intent for combined confirmations and results."""
+    if item.get('type') == 'task':
+        due = f" (due {item['due'].replace('T', ' ')})" if item.get('due') else ""
+        return f"📝 {item.get('title')}{due}"
+    return f"📅 {item.get('summary')} — {str(item.get('start', '')).replace('T', ' ')}"
+
+async def create_intents(items: list, user_id: int = None, description_suffix: str = "") -> list:
+    """
+    Creates parsed tasks and events with one Tasks batch and one Calendar batch,
+    sent concurrently. Returns (item, link, error) triples in the order of `items`.
+    """
+    tasks, events, outcomes = [], [], {}
+    for index, item in enumerate(items):
+        try:
+            if item.get('type') == 'task':
+                tasks.append((index, {
+                    'title': item['title'],
+                    'notes': item.get('notes') or '',
+                    'due': item.get('due'),
+                    'tasklist_id': item.get('list_id') or '@default',
+                }))
+            elif item.get('type') == 'event':
+                events.append((index, {
+                    'summary': item['summary'],
+                    'start_time': datetime.datetime.fromisoformat(item['start']),
+                    'end_time': datetime.datetime.fromisoformat(item['end']),
+                    'description': (item.get('description') or '') + description_suffix,
+                    'recurrence': item.get('recurrence'),
+                    'reminders': item.get('reminders'),
+                }))
+            else:
+                outcomes[index] = (None, ValueError(f"unknown type {item.get('type')!r}"))
+        except (KeyError, TypeError, ValueError) as e:
+            outcomes[index] = (None, e)
+
+    async def no_results():
+        return []
+
+    task_results, event_results = await asyncio.gather(
+        async_tasks_service.create_tasks([kw for _, kw in tasks]) if tasks else no_results(),
+        async_calendar_service.create_events([kw for _, kw in events], user_id=user_id) if events else no_results(),
+        return_exceptions=True
+    )
+    # One API failing outright must not hide what the other one created
+    for created, results in ((tasks, task_results), (events, event_results)):
+        if isinstance(results, Exception):
+            results = [(None, results)] * len(created)
+        outcomes.update(zip([i for i, _ in created], results))
+    return [(item, *outcomes[index]) for index, item in enumerate(items)]
+
+def format_created(results: list) -> str:
+    created = sum(1 for _, _, error in results if error is None)
+    lines = [f"✅ **Created {created}/{len(results)} items:**"]
+    for item, link, error in results:
+        if error is not None:
+            lines.append(f"❌ {describe_intent(item)}: {error}")
+        elif link:
+            lines.append(f"{describe_intent(item)} — [open]({link})")
+        else:
+            lines.append(describe_intent(item))
+    return "\n".join(lines)
+
+@router.callback_query(lambda c: c.data in ["confirm_batch", "cancel_batch"])
+async def process_batch_confirmation(callback_query: types.CallbackQuery):
+    user_id = callback_query.from_user.id
+
+    state_info = USER_STATE.get(user_id)
+    if not state_info or state_info.get("state") != "CONFIRM_BATCH":
+        await callback_query.answer("⚠️ Session expired.", show_alert=True)
+        await callback_query.message.delete()
+        return
+
+    del USER_STATE[user_id]
+    if callback_query.data == "cancel_batch":
+        await callback_query.message.edit_text("❌ All items cancelled.")
+        return
+
+    items = state_info.get("items", [])
+    try:
+        await callback_query.message.edit_text(f"⏳ Creating {len(items)} items...")
+        results = await create_intents(items, user_id=user_id)
+        await callback_query.message.edit_text(format_created(results), parse_mode="Markdown")
+    except Exception as e:
+        await callback_query.message.edit_text(f"❌ Error: {e}")
+
+async def confirm_intents(wait_msg: types.Message, user_id: int, items: list):
+    """Shows every intent of a multi-intent message in one confirmation."""
+    USER_STATE[user_id] = {
+        "state": "CONFIRM_BATCH",
+        "items": items
+    }
+    conflicts = await asyncio.gather(*(
+        describe_conflicts(user_id, item) for item in items if item.get('type') == 'event'
+    ))
+    lines = "\n".join(describe_intent(item) for item in items)
+    await wait_msg.edit_text(
+        f"{guess_note(items)}📋 **Verify {len(items)} items:**\n\n{lines}\n\n{''.join(conflicts)}Create all of them?",
+        reply_markup=get_confirm_keyboard("batch"), parse_mode="Markdown"
+    )
+
 @router.message(F.text)
 async def handle_text(message: types.Message):
     user_id = message.from_user.id
@@ -143,7 +290,7 @@ async def handle_text(message: types.Message):
     text = message.text
 
     # Skip commands/menus handled by other routers (sanity check)
-    if text.startswith("/") or text in ["📅 Agenda", "➕ New task", "🔄 Refresh Lists", "🔙 Back"]:
+    if text.startswith("/") or text in MENU_TEXTS:
         return
 
     # === HANDLE WIZARD STATES ===
@@ -152,17 +299,17 @@ async def handle_text(message: types.Message):
         
         if state == "CHOOSING_PROJECT":
             lists = state_info.get("lists", [])
-            selected_list = next((l for l in lists if l['title'] == text), None)
+            selected_list = next((l for l in lists if l.title == text), None)
             
             if selected_list:
                 USER_STATE[user_id] = {
                     "state": "WAITING_FOR_TASK",
-                    "list_id": selected_list['id'],
-                    "list_title": selected_list['title']
+                    "list_id": selected_list.id,
+                    "list_title": selected_list.title
                 }
                 kb = [[types.KeyboardButton(text="🔙 Back")]]
                 keyboard = types.ReplyKeyboardMarkup(keyboard=kb, resize_keyboard=True)
-                await message.answer(f"📝 Enter the task for **{selected_list['title']}**:", 
+                await message.answer(f"📝 Enter the task for **{selected_list.title}**:", 
                                      reply_markup=keyboard, parse_mode="Markdown")
                 return
             else:
@@ -175,7 +322,7 @@ async def handle_text(message: types.Message):
             list_title = state_info.get("list_title")
             
             try:
-                tasks_service.create_task(title=text, notes="", tasklist_id=list_id)
+                await async_tasks_service.create_task(title=text, notes="", tasklist_id=list_id)
                 await message.answer(f"✅ Saved **{text}** to **{list_title}**!", 
                                      reply_markup=get_main_menu(), parse_mode="Markdown")
                 del USER_STATE[user_id]
@@ -189,21 +336,28 @@ async def handle_text(message: types.Message):
     try:
         # Fetch lists context
         try:
-            available_lists = tasks_service.get_task_lists()
+            available_lists = await async_tasks_service.get_task_lists()
         except:
             available_lists = []
 
         # Parse with AI Service
-        event_data = await ai_service.parse_event(text, task_lists=available_lists)
+        intents = await ai_service.parse_event(text, task_lists=available_lists, user_id=user_id)
         
-        if not event_data:
+        if not intents:
             await wait_msg.edit_text("😕 I couldn't understand the date/time.")
             return
 
+        # === 0. SEVERAL THINGS AT ONCE ===
+        if len(intents) > 1:
+            await confirm_intents(wait_msg, user_id, intents)
+            return
+        event_data = intents[0]
+
         # === 1. TASK ===
         if event_data.get('type') == 'task':
             keyboard = get_project_selection_keyboard(available_lists)
             await wait_msg.edit_text(
+                f"{guess_note(intents)}"
                 f"📂 Task Detected: {event_data.get('title')}\n"
                 f"👇 <b>Select the Project (or ignore to use default):</b>",
                 reply_markup=keyboard, parse_mode="HTML"
@@ -220,16 +374,21 @@ async def handle_text(message: types.Message):
         summary = event_data['summary']
         start_pretty = event_data['start'].replace('T', ' ')
         end_pretty = event_data['end'].replace('T', ' ')
+        conflicts_text = await describe_conflicts(user_id, event_data)
         
         confirm_text = (
+            f"{guess_note(intents)}"
             f"📅 **Verify Event:**\n\n"
             f"📌 **{summary}**\n"
             f"🕒 {start_pretty}\n"
             f"🛑 {end_pretty}\n\n"
+            f"{conflicts_text}"
             f"Create this event?"
         )
         
         await wait_msg.edit_text(confirm_text, reply_markup=get_confirm_keyboard("event"), parse_mode="Markdown")
 
+    except SupersededError:
+        await wait_msg.edit_text("⏭️ Skipped — a newer message arrived.")
     except Exception as e:
         await wait_msg.edit_text(f"❌ Error: {str(e)}")
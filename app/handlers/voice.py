@@ -1,9 +1,10 @@
 from aiogram import Router, types, F, Bot
 from app.core import config
-from app.services.ai.service import ai_service
-from app.services.tasks.service import tasks_service
-from app.services.calendar.service import calendar_service
-import os
+from app.handlers.tasks import create_intents, format_created, guess_note
+from app.services.ai.service import ai_service, SupersededError
+from app.services.tasks.service import async_tasks_service
+from app.services.calendar.service import async_calendar_service
+import asyncio
 import datetime
 
 router = Router()
@@ -17,36 +18,37 @@ async def handle_voice(message: types.Message, bot: Bot):
     wait_msg = await message.answer("👂 Listening & Thinking...")
 
     try:
-        # 1. Download voice file
-        file_id = message.voice.file_id
-        file = await bot.get_file(file_id)
-        file_path = file.file_path
-        
-        local_filename = f"voice_{message.message_id}.ogg"
-        await bot.download_file(file_path, local_filename)
+        # 1. Download voice note into memory
+        audio = await bot.download(message.voice)
 
-        # 2. Process with AI Service
-        event_data = await ai_service.parse_audio(local_filename)
-        
-        os.remove(local_filename)
+        # 2. Process with AI Service (task lists load while Whisper transcribes)
+        lists_task = asyncio.create_task(async_tasks_service.get_task_lists())
+        intents = await ai_service.parse_audio(
+            audio, filename=f"voice_{message.message_id}.ogg", duration=message.voice.duration,
+            task_lists=lists_task, user_id=message.from_user.id
+        )
 
-        if not event_data:
+        if not intents:
              await wait_msg.edit_text("😕 I couldn't understand the audio.")
              return
 
+        # === SEVERAL THINGS AT ONCE (one batch per API) ===
+        if len(intents) > 1:
+            results = await create_intents(intents, user_id=message.from_user.id, description_suffix="\n(Created via Voice)")
+            await wait_msg.edit_text(format_created(results), parse_mode="Markdown")
+            return
+        event_data = intents[0]
+
         # === HANDLE TASK ===
         if event_data.get('type') == 'task':
-            # Create directly for now, or we could use the UI flow?
-            # Let's keep voice simple: Auto-create in default list for now, 
-            # OR ask the user? Best to ask.
-            # But callback logic needs message text.
-            # For iteration 1, let's just create in Default to be fast.
-            task_link = tasks_service.create_task(
+            # Voice has no list picker: use the list the model chose (or Default).
+            task_link = await async_tasks_service.create_task(
                 title=event_data['title'],
                 notes=event_data.get('notes', ''),
-                due=event_data.get('due')
+                due=event_data.get('due'),
+                tasklist_id=event_data.get('list_id') or '@default'
             )
-            await wait_msg.edit_text(f"✅ **Task Created!**\n"
+            await wait_msg.edit_text(f"{guess_note(intents)}✅ **Task Created!**\n"
                                      f"📝 {event_data['title']}\n"
                                      f"🔗 [Open Google Tasks]({task_link})", parse_mode="Markdown")
             return
@@ -55,16 +57,19 @@ async def handle_voice(message: types.Message, bot: Bot):
         start_dt = datetime.datetime.fromisoformat(event_data['start'])
         end_dt = datetime.datetime.fromisoformat(event_data['end'])
         
-        link = calendar_service.create_event(
+        link = await async_calendar_service.create_event(
             summary=event_data['summary'],
             start_time=start_dt,
             end_time=end_dt,
-            description=event_data.get('description', '') + "\n(Created via Voice)"
+            description=event_data.get('description', '') + "\n(Created via Voice)",
+            user_id=message.from_user.id
         )
         
-        await wait_msg.edit_text(f"✅ **Event Created!**\n"
+        await wait_msg.edit_text(f"{guess_note(intents)}✅ **Event Created!**\n"
                                  f"📅 {event_data['summary']}\n"
                                  f"🔗 [Open in Google Calendar]({link})", parse_mode="Markdown")
                                  
+    except SupersededError:
+        await wait_msg.edit_text("⏭️ Skipped — a newer message arrived.")
     except Exception as e:
         await wait_msg.edit_text(f"❌ Error: {str(e)}")
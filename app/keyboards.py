@@ -24,8 +24,27 @@ def get_project_selection_keyboard(lists: list) -> InlineKeyboardMarkup:
     """Returns inline buttons for project selection."""
     buttons = []
     for l in lists:
-        btn = InlineKeyboardButton(text=l['title'], callback_data=f"list:{l['id']}")
+        btn = InlineKeyboardButton(text=l.title, callback_data=f"list:{l.id}")
         buttons.append([btn])
     
     buttons.append([InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_task")])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+def get_agenda_keyboard(window: str, page: int, total_pages: int, windows: dict) -> InlineKeyboardMarkup:
+    """Returns window switcher [Today] [Tomorrow] [This Week] and ◀️ page ▶️ buttons."""
+    window_row = [
+        InlineKeyboardButton(text=f"• {label}" if key == window else label, callback_data=f"agenda:{key}:0")
+        for key, label in windows.items()
+    ]
+    buttons = [window_row]
+
+    if total_pages > 1:
+        nav_row = []
+        if page > 0:
+            nav_row.append(InlineKeyboardButton(text="◀️", callback_data=f"agenda:{window}:{page - 1}"))
+        nav_row.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="agenda:noop"))
+        if page < total_pages - 1:
+            nav_row.append(InlineKeyboardButton(text="▶️", callback_data=f"agenda:{window}:{page + 1}"))
+        buttons.append(nav_row)
+
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
@@ -1,7 +1,21 @@
 from fastapi import FastAPI, Request
-from aiogram import types, Bot
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.bot import dp, bot
 from app.core import config
+from app.core.decoding import decode_update
+from app.core.dedup import create_deduplicator
+from app.core.metrics import metrics
+from app.core.worker_pool import UpdateWorkerPool
+from app.handlers.tasks import will_parse
+from app.services.ai.service import ai_service
+from app.services.calendar.agenda import agenda_engine
+from app.services.calendar.client import calendar_client
+from app.services.calendar.service import async_calendar_service, calendar_service
+from app.services.calendar.watch import watch_manager
+from app.services.google.credentials import credential_manager
+from app.services.google.executor import google_executor
+from app.services.tasks.client import tasks_client
+import asyncio
 import logging
 
 # Configure Logging
@@ -10,34 +24,119 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+worker_pool = UpdateWorkerPool(
+    dp, bot,
+    workers=config.settings.UPDATE_WORKERS,
+    max_queue_size=config.settings.UPDATE_QUEUE_SIZE
+)
+
+deduplicator = create_deduplicator(
+    ttl=config.settings.DEDUP_TTL_SECONDS,
+    max_size=config.settings.DEDUP_MAX_SIZE,
+    redis_url=config.settings.DEDUP_REDIS_URL
+)
+
+async def warm_up_services():
+    """Authenticates Google clients in the background once the server is already serving."""
+    for client in (calendar_client, tasks_client):
+        try:
+            await google_executor.run(client.get_service)
+        except Exception as e:
+            logger.warning(f"⚠️ Warm-up failed: {e}")
+    credential_manager.start_background_refresh(google_executor)
+
+async def start_calendar_watch():
+    """Registers a Calendar push channel for every agenda calendar and keeps renewing them before they expire."""
+    try:
+        calendars = await async_calendar_service.list_calendars()
+    except Exception as e:
+        logger.warning(f"⚠️ Calendar push channels not registered: {e}")
+        return
+    # Channels use the calendarList ids, the same keys the agenda's sync stores use
+    for calendar in calendars:
+        try:
+            await google_executor.run(watch_manager.register, calendar.id)
+        except Exception as e:
+            logger.warning(f"⚠️ Calendar push channel for {calendar.summary} not registered: {e}")
+    watch_manager.start_renewal(google_executor)
+
+async def refresh_calendar(calendar_id: str):
+    try:
+        await async_calendar_service.sync_calendar(calendar_id)
+        agenda_engine.invalidate()
+        calendar_service.freebusy.invalidate()
+    except Exception as e:
+        logger.error(f"Calendar refresh after push notification failed: {e}")
+
+# Keep references so background tasks are not garbage-collected mid-flight
+background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
 @app.on_event("startup")
 async def on_startup():
     """Register webhook on startup if URL is configured."""
+    worker_pool.start()
+    run_in_background(warm_up_services())
     webhook_url = config.settings.WEBHOOK_URL
     if webhook_url:
         webhook_endpoint = f"{webhook_url}{config.settings.WEBHOOK_PATH}"
         logger.info(f"🚀 Setting webhook to: {webhook_endpoint}")
         await bot.set_webhook(webhook_endpoint)
+        if config.settings.GOOGLE_PUSH_ENABLED and config.settings.GOOGLE_PUSH_SECRET:
+            run_in_background(start_calendar_watch())
+        elif config.settings.GOOGLE_PUSH_ENABLED:
+            logger.warning("⚠️ GOOGLE_PUSH_SECRET not set. Calendar push notifications are disabled.")
     else:
         logger.warning("⚠️ WEBHOOK_URL not set. Running in server mode without webhook registration.")
 
 @app.on_event("shutdown")
 async def on_shutdown():
-    """Remove webhook on shutdown."""
-    logger.info("🛑 Removing webhook...")
+    """Drain queued updates and stop this instance's Calendar push channels (the webhook stays registered)."""
+    logger.info("🛑 Draining update queue...")
+    await worker_pool.stop()
+    credential_manager.stop_background_refresh()
+    watch_manager.stop_renewal()
+    # Channels outlive the instance otherwise and keep notifying a dead address
+    try:
+        await google_executor.run(watch_manager.stop_all)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to stop Calendar push channels: {e}")
     # await bot.delete_webhook()
     # In Cloud Run (Serverless), we must NOT remove the webhook on shutdown, 
     # otherwise the bot will stop receiving messages when the container sleeps.
-    pass
 
 @app.post(config.settings.WEBHOOK_PATH)
 async def bot_webhook(request: Request):
-    """Receive updates from Telegram."""
-    update_data = await request.json()
-    update = types.Update(**update_data)
-    await dp.feed_update(bot, update)
+    """Receive updates from Telegram and acknowledge them immediately."""
+    update = decode_update(await request.body(), bot)
+    if await deduplicator.is_duplicate(update.update_id):
+        logger.info(f"♻️ Skipping duplicate update {update.update_id}")
+        return {"status": "ok"}
+    if update.message and update.message.from_user and will_parse(update.message):
+        # A newer message for the LLM makes the user's pending request obsolete
+        ai_service.cancel(update.message.from_user.id, update.message.text)
+    if not worker_pool.submit(update):
+        # Not a 200, so Telegram redelivers the update later instead of dropping it
+        await deduplicator.forget(update.update_id)
+        return JSONResponse({"status": "busy"}, status_code=503)
     return {"status": "ok"}
 
+@app.post(config.settings.GOOGLE_PUSH_PATH)
+async def google_push_notification(request: Request):
+    """Receive Google Calendar change notifications and refresh the local event store."""
+    calendar_id = watch_manager.parse_notification(request.headers)
+    if calendar_id:
+        run_in_background(refresh_calendar(calendar_id))
+    return {"status": "ok"}
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render())
+
 @app.get("/")
 async def root():
     return {"status": "Telegram Calendar Bot is running"}
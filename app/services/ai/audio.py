@@ -0,0 +1,72 @@
+import array
+import asyncio
+import io
+import logging
+import math
+import shutil
+import wave
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # Whisper resamples to 16 kHz mono anyway
+WINDOW_MS = 50
+ENERGY_STRIDE = 4  # every 4th sample is plenty for a loudness estimate
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+async def decode_to_pcm(data: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Decodes any ffmpeg-readable audio (Telegram voice notes are OGG/Opus) to 16-bit mono PCM."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    pcm, error = await process.communicate(data)
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {error.decode(errors='replace').strip()}")
+    return pcm
+
+def window_energies(pcm: bytes, sample_rate: int = SAMPLE_RATE, window_ms: int = WINDOW_MS) -> list:
+    """RMS loudness of each `window_ms` window of 16-bit mono PCM."""
+    samples = array.array('h')
+    samples.frombytes(pcm[:len(pcm) - len(pcm) % 2])
+    window = sample_rate * window_ms // 1000
+    energies = []
+    for start in range(0, len(samples), window):
+        chunk = samples[start:start + window:ENERGY_STRIDE]
+        energies.append(math.sqrt(sum(s * s for s in chunk) / len(chunk)) if chunk else 0.0)
+    return energies
+
+def split_on_silence(pcm: bytes, sample_rate: int = SAMPLE_RATE, target_seconds: float = 30,
+                     max_seconds: float = 45, window_ms: int = WINDOW_MS) -> list:
+    """
+    Splits PCM into chunks of roughly `target_seconds`.
+
+    Each cut is placed at the quietest window between `target_seconds` and
+    `max_seconds` into the chunk, so words are not cut in half. Returns a list
+    of PCM byte strings in order.
+    """
+    bytes_per_window = sample_rate * window_ms // 1000 * 2
+    energies = window_energies(pcm, sample_rate, window_ms)
+    target = int(target_seconds * 1000 / window_ms)
+    longest = int(max_seconds * 1000 / window_ms)
+
+    chunks = []
+    start = 0
+    while len(energies) - start > longest:
+        candidates = range(start + target, start + longest)
+        cut = min(candidates, key=lambda i: energies[i])
+        chunks.append(pcm[start * bytes_per_window:cut * bytes_per_window])
+        start = cut
+    chunks.append(pcm[start * bytes_per_window:])
+    return chunks
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
@@ -0,0 +1,131 @@
+import copy
+import datetime
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from zoneinfo import ZoneInfo
+from app.core import config
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+latency_saved = metrics.counter("ai_response_cache_latency_saved_seconds_total", "LLM latency avoided by parse_event cache hits")
+hit_ratio = metrics.gauge("ai_response_cache_hit_ratio", "Share of parse_event lookups answered from the cache")
+
+# Phrases that resolve against the current time, not just the current day
+RELATIVE_TO_NOW = re.compile(r"\b(now|later|soon|from now|in (a|an|\d+|half an?) (min|minute|hour)s?)\b")
+
+def normalize_text(text: str) -> str:
+    """Lowercases, collapses whitespace and drops trailing punctuation."""
+    return " ".join(text.lower().split()).rstrip(".!?")
+
+def is_cacheable(text: str) -> bool:
+    return RELATIVE_TO_NOW.search(normalize_text(text)) is None
+
+# Bump when the cached result shape changes (2: list of intents)
+KEY_VERSION = 2
+
+def make_key(text: str, user_timezone: str, task_lists: list = None, now: datetime.datetime = None) -> str:
+    """Key = normalized text + the user's current date and hour + the available task lists."""
+    now = now or datetime.datetime.now(ZoneInfo(user_timezone))
+    list_ids = sorted(l.id for l in task_lists or [])
+    raw = json.dumps([KEY_VERSION, normalize_text(text), now.strftime('%Y-%m-%dT%H'), user_timezone, list_ids])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class SqliteResponseStore:
+    """Keeps cached parse results across restarts in a local SQLite file."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT, latency REAL, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def load(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, latency FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def save(self, key: str, value: list, latency: float, ttl: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), latency, time.time() + ttl)
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+class ParseResponseCache:
+    """
+    LRU/TTL cache of parse_event results.
+
+    Relative dates ("tomorrow") and bare times ("at 5", "in the evening":
+    today or tomorrow?) resolve against the current time, so the date and
+    hour are part of the key; texts relative to the current minute ("in 2
+    hours") are never cached.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1000, store=None):
+        self.ttl = ttl
+        self.memory = TTLCache("ai_response", ttl=ttl, max_size=max_size)
+        self.store = store
+        self._lookups = 0
+        self._hits = 0
+
+    def _record(self, hit: bool, latency: float = 0.0):
+        self._lookups += 1
+        if hit:
+            self._hits += 1
+            latency_saved.inc(latency)
+        hit_ratio.set(self._hits / self._lookups)
+
+    def get(self, key: str) -> list | None:
+        cached = self.memory.get(key)
+        if cached is None and self.store is not None:
+            try:
+                cached = self.store.load(key)
+            except Exception as e:
+                logger.error(f"AI cache store read failed: {e}")
+            if cached is not None:
+                self.memory.set(key, cached)
+        if cached is None:
+            self._record(hit=False)
+            return None
+        value, latency = cached
+        self._record(hit=True, latency=latency)
+        # Callers keep and edit the result (e.g. in USER_STATE)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: list, latency: float):
+        self.memory.set(key, (copy.deepcopy(value), latency))
+        if self.store is not None:
+            try:
+                self.store.save(key, value, latency, self.ttl)
+            except Exception as e:
+                logger.error(f"AI cache store write failed: {e}")
+
+def create_response_cache() -> ParseResponseCache:
+    store = None
+    if config.settings.AI_CACHE_PATH:
+        try:
+            store = SqliteResponseStore(config.settings.AI_CACHE_PATH)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not open AI cache at {config.settings.AI_CACHE_PATH}: {e}. Using memory only.")
+    return ParseResponseCache(
+        ttl=config.settings.AI_CACHE_TTL,
+        max_size=config.settings.AI_CACHE_MAX_SIZE,
+        store=store
+    )
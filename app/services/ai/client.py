@@ -1,17 +1,43 @@
-from groq import Groq
+import asyncio
 from app.core import config
+from app.core.metrics import metrics
+from app.services.ai.key_pool import ApiKeyPool, ApiKeyState
 import logging
 
 logger = logging.getLogger(__name__)
 
+inflight_gauge = metrics.gauge("groq_inflight_requests", "Groq requests currently in flight")
+request_latency = metrics.summary("groq_request_seconds", "Latency of Groq API calls")
+timeouts = metrics.counter("groq_timeouts_total", "Groq calls that exceeded GROQ_TIMEOUT_SECONDS")
+transient_retries = metrics.counter("groq_transient_retries_total", "Groq calls retried after a 5xx or connection error")
+
+# The SDK's own retries are off (see get_key_pool); 5xx and connection errors get this many here
+TRANSIENT_RETRIES = 1
+
+def api_keys() -> list:
+    """GROQ_API_KEY plus any extra keys in GROQ_API_KEYS (comma-separated), without duplicates."""
+    keys = [config.settings.GROQ_API_KEY] + (config.settings.GROQ_API_KEYS or "").split(",")
+    return list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+
 class GroqClientWrapper:
     def __init__(self):
+        # The Groq SDK is imported and the clients created on first use
+        # to keep container cold starts fast.
         self.client = None
-        self.text_model = "llama-3.3-70b-versatile"
-        self.audio_model = "distil-whisper-large-v3-en"
-        
+        self.key_pool = None
+        # Small model first; the large one for complex input and escalations
+        self.small_model = config.settings.GROQ_SMALL_MODEL
+        self.text_model = config.settings.GROQ_LARGE_MODEL
+        self.fallback_model = config.settings.GROQ_FALLBACK_MODEL
+        self.audio_model = config.settings.GROQ_AUDIO_MODEL
+        self.timeout = config.settings.GROQ_TIMEOUT_SECONDS
+        self._semaphore = asyncio.Semaphore(config.settings.GROQ_MAX_CONCURRENCY)
+        self._inflight = 0
+
+    def _init_client(self):
         if config.settings.GROQ_API_KEY:
             try:
+                from groq import Groq
                 self.client = Groq(api_key=config.settings.GROQ_API_KEY)
                 logger.info("✅ Groq Client initialized successfully")
             except Exception as e:
@@ -20,9 +46,98 @@ class GroqClientWrapper:
             logger.warning("⚠️ GROQ API Key missing in environment settings!")
 
     def get_client(self):
+        """Sync client (used by the CLI agents)."""
+        if not self.client:
+            self._init_client()
         if not self.client:
             raise Exception("GROQ API Key is missing or invalid")
         return self.client
 
+    def get_key_pool(self) -> ApiKeyPool:
+        """Async clients, one per API key, sharing one keep-alive connection pool."""
+        if self.key_pool is None:
+            keys = api_keys()
+            if not keys:
+                raise Exception("GROQ API Key is missing or invalid")
+            import httpx
+            from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+            limit = config.settings.GROQ_MAX_CONCURRENCY
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit)
+            )
+            # 429s are handled by switching keys, so the SDK must not retry them on the same key;
+            # _send retries 5xx and connection errors itself
+            self.key_pool = ApiKeyPool([
+                ApiKeyState(f"key#{i + 1} (…{key[-4:]})", AsyncGroq(
+                    api_key=key,
+                    base_url=config.settings.GROQ_BASE_URL,
+                    http_client=http_client,
+                    timeout=self.timeout,
+                    max_retries=0
+                ))
+                for i, key in enumerate(keys)
+            ])
+            logger.info(f"✅ Async Groq Client initialized with {len(keys)} API key(s)")
+        return self.key_pool
+
+    async def _send(self, send):
+        """
+        Sends on the key with the most rate-limit headroom, moving on to the next
+        key after a 429 and retrying once after a 5xx or connection error.
+        """
+        from groq import APIConnectionError, InternalServerError, RateLimitError
+
+        pool = self.get_key_pool()
+        rate_limited, retries_left = 0, TRANSIENT_RETRIES
+        while True:
+            state = pool.acquire()
+            try:
+                raw = await send(state.client)
+            except RateLimitError as e:
+                pool.pause(state, e.response.headers)
+                rate_limited += 1
+                if rate_limited >= len(pool):
+                    raise
+                continue
+            except (APIConnectionError, InternalServerError) as e:
+                if retries_left == 0:
+                    raise
+                retries_left -= 1
+                transient_retries.inc()
+                logger.warning(f"⚠️ Groq {state.name} failed ({e}), retrying")
+                continue
+            finally:
+                pool.release(state)
+            pool.update(state, raw.headers)
+            return await raw.parse()
+
+    async def _call(self, make_request):
+        async with self._semaphore:
+            self._inflight += 1
+            inflight_gauge.set(self._inflight)
+            try:
+                with request_latency.time():
+                    async with asyncio.timeout(self.timeout):
+                        return await make_request()
+            except TimeoutError:
+                timeouts.inc()
+                raise
+            finally:
+                self._inflight -= 1
+                inflight_gauge.set(self._inflight)
+
+    async def chat(self, **kwargs):
+        """Chat completion with the shared concurrency limit and a per-call timeout."""
+        return await self._call(lambda: self._send(
+            lambda client: client.chat.completions.with_raw_response.create(**kwargs)
+        ))
+
+    async def transcribe(self, **kwargs):
+        """Audio transcription with the shared concurrency limit and a per-call timeout."""
+        return await self._call(lambda: self._send(
+            lambda client: client.audio.transcriptions.with_raw_response.create(**kwargs)
+        ))
+
 # Singleton instance
 groq_client = GroqClientWrapper()
@@ -0,0 +1,106 @@
+import logging
+import re
+import time
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+rate_limited = metrics.counter("groq_key_rate_limited_total", "429 responses that paused a Groq API key")
+keys_available = metrics.gauge("groq_keys_available", "Groq API keys not currently paused")
+
+DIMENSIONS = ('requests', 'tokens')
+DEFAULT_PAUSE_SECONDS = 5.0
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def _number(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_reset_seconds(value) -> float | None:
+    """Parses Groq reset headers such as "7.66s", "2m59.56s" or "120ms"."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+class KeysExhaustedError(Exception):
+    """Raised when every Groq API key is paused after a 429."""
+
+class ApiKeyState:
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+        # dimension -> (remaining, limit, reset_at)
+        self.limits = {}
+        self.paused_until = 0.0
+        self.inflight = 0
+
+    def headroom(self, now: float) -> float:
+        """Smallest remaining/limit share over requests and tokens (1.0 when unknown or reset)."""
+        ratios = [1.0]
+        for remaining, limit, reset_at in self.limits.values():
+            if limit and reset_at > now:
+                ratios.append(remaining / limit)
+        return min(ratios)
+
+class ApiKeyPool:
+    """
+    Spreads Groq calls over several API keys.
+
+    Each response's x-ratelimit-* headers update the key's remaining request
+    and token budget; new calls go to the key with the most headroom. A key
+    that answers 429 (or runs out of budget) is paused until its reset time.
+    """
+
+    def __init__(self, states: list):
+        self.states = states
+        self.clock = time.monotonic
+
+    def __len__(self):
+        return len(self.states)
+
+    def acquire(self) -> ApiKeyState:
+        now = self.clock()
+        ready = [s for s in self.states if s.paused_until <= now]
+        keys_available.set(len(ready))
+        if not ready:
+            wait = min(s.paused_until for s in self.states) - now
+            raise KeysExhaustedError(f"All {len(self.states)} Groq keys are rate limited for another {wait:.1f}s")
+        state = max(ready, key=lambda s: (s.headroom(now), -s.inflight))
+        state.inflight += 1
+        return state
+
+    def release(self, state: ApiKeyState):
+        state.inflight -= 1
+
+    def update(self, state: ApiKeyState, headers):
+        """Records the x-ratelimit-* headers of a response; malformed values are ignored."""
+        now = self.clock()
+        for dim in DIMENSIONS:
+            remaining = _number(headers.get(f"x-ratelimit-remaining-{dim}"))
+            if remaining is None:
+                continue
+            limit = _number(headers.get(f"x-ratelimit-limit-{dim}"))
+            reset = parse_reset_seconds(headers.get(f"x-ratelimit-reset-{dim}")) or 0.0
+            state.limits[dim] = (remaining, limit, now + reset)
+            if remaining <= 0:
+                state.paused_until = max(state.paused_until, now + reset)
+
+    def pause(self, state: ApiKeyState, headers):
+        """Pauses a key after a 429 until Retry-After (or its rate-limit reset)."""
+        delay = parse_reset_seconds(headers.get("retry-after"))
+        if delay is None:
+            resets = [parse_reset_seconds(headers.get(f"x-ratelimit-reset-{dim}")) for dim in DIMENSIONS]
+            delay = max([r for r in resets if r is not None], default=DEFAULT_PAUSE_SECONDS)
+        state.paused_until = self.clock() + delay
+        rate_limited.inc()
+        logger.warning(f"⏸️ Groq {state.name} rate limited, paused for {delay:.1f}s")
@@ -0,0 +1,229 @@
+import datetime
+import re
+from dataclasses import dataclass
+from app.services.ai.cache import RELATIVE_TO_NOW
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+PARTS_OF_DAY = {
+    'morning': 9,
+    'noon': 12,
+    'afternoon': 14,
+    'evening': 18,
+    'tonight': 20,
+    'midnight': 0,
+}
+
+PREFIX = re.compile(r"^\s*(please\s+)?(remind me to|remember to|don'?t forget to|i need to|need to|i have to|todo:?)\s+", re.I)
+DAY = re.compile(r"\b(?:on\s+)?(day after tomorrow|today|tomorrow|tonight|(?:(next|this)\s+)?(" + "|".join(WEEKDAYS) + r"))\b", re.I)
+TIME_AMPM = re.compile(r"\b(?:at\s+)?(\d{1,2})(?::([0-5]\d))?\s*([ap])\.?m\b\.?", re.I)
+TIME_24H = re.compile(r"\b(?:at\s+)?([01]?\d|2[0-3]):([0-5]\d)\b(?!\s*[ap]\.?m)", re.I)
+TIME_BARE = re.compile(r"\bat\s+(\d{1,2})\b(?![:.]?\d|\s*[ap]\.?m)", re.I)
+PART_OF_DAY = re.compile(r"\b(?:in the\s+|this\s+|at\s+)?(morning|afternoon|evening|noon|midnight)\b", re.I)
+DURATION = re.compile(r"\bfor\s+(\d+|an?|half an)\s*(hours?|hrs?|h|minutes?|mins?)\b", re.I)
+
+# Anything the rules below do not understand goes to the LLM
+UNSUPPORTED = {
+    'every', 'daily', 'weekly', 'monthly', 'yearly', 'weekdays', 'weekend', 'week', 'month', 'year',
+    'until', 'till', 'before', 'after', 'between', 'from', 'next', 'last', 'ago', 'then',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+    'october', 'november', 'december', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept',
+    'oct', 'nov', 'dec',
+}
+TRAILING_FILLER = {'on', 'at', 'by', 'for', 'in', 'the', 'this'}
+
+MAX_TITLE_WORDS = 8
+LIST_SEPARATOR = re.compile(r"[,;]")
+ACTION_VERBS = [
+    'buy', 'call', 'email', 'text', 'message', 'send', 'pay', 'book', 'order', 'pick', 'get', 'go', 'visit',
+    'meet', 'write', 'read', 'fix', 'clean', 'check', 'finish', 'submit', 'review', 'schedule', 'cancel',
+    'renew', 'water', 'take', 'bring', 'make', 'do', 'prepare', 'feed', 'wash', 'ask', 'tell', 'remind',
+]
+# "buy milk and call the bank" is two intents, "buy milk and eggs" is one
+JOINED_ACTION = re.compile(r"\b(?:and|then|also)\s+(?:(?:then|also)\s+)?(?:" + "|".join(ACTION_VERBS) + r")\b", re.I)
+
+@dataclass
+class LocalParse:
+    result: dict
+    confidence: float
+
+def _single(pattern, text):
+    """Returns the only match of `pattern`, None if absent, or False if it occurs more than once."""
+    matches = list(pattern.finditer(text))
+    if len(matches) > 1:
+        return False
+    return matches[0] if matches else None
+
+def _resolve_day(match, now: datetime.datetime) -> tuple:
+    """Returns (date, confidence) for a DAY match."""
+    phrase = match.group(1).lower()
+    if phrase in ('today', 'tonight'):
+        return now.date(), 1.0
+    if phrase == 'tomorrow':
+        return now.date() + datetime.timedelta(days=1), 1.0
+    if phrase == 'day after tomorrow':
+        return now.date() + datetime.timedelta(days=2), 1.0
+
+    target = WEEKDAYS.index(match.group(3).lower())
+    days_ahead = (target - now.weekday()) % 7
+    if days_ahead == 0:
+        # "on monday" said on a Monday: today or next week?
+        return now.date() + datetime.timedelta(days=7), 0.5
+    # "next friday" may mean this coming Friday or the one after
+    return now.date() + datetime.timedelta(days=days_ahead), 0.6 if match.group(2) else 1.0
+
+def _resolve_time(text: str) -> tuple:
+    """Returns (time, spans, confidence); time is None when the text has no time of day."""
+    found = {}
+    for pattern in (TIME_AMPM, TIME_24H, TIME_BARE, PART_OF_DAY):
+        match = _single(pattern, text)
+        if match is False:
+            return None, [], 0.0
+        if match is not None:
+            found[pattern] = match
+
+    part = found.pop(PART_OF_DAY, None)
+    if len(found) > 1:
+        return None, [], 0.0
+    if not found:
+        if part is None:
+            return None, [], 1.0
+        return datetime.time(PARTS_OF_DAY[part.group(1).lower()]), [part.span()], 1.0
+
+    # "tomorrow morning at 9am": the explicit time wins
+    spans = [part.span()] if part is not None else []
+    (pattern, match), = found.items()
+    spans.append(match.span())
+    if pattern is TIME_AMPM:
+        hour = int(match.group(1))
+        if not 1 <= hour <= 12:
+            return None, [], 0.0
+        hour = hour % 12 + (12 if match.group(3).lower() == 'p' else 0)
+        return datetime.time(hour, int(match.group(2) or 0)), spans, 1.0
+    if pattern is TIME_24H:
+        return datetime.time(int(match.group(1)), int(match.group(2))), spans, 1.0
+
+    # "at 3" is probably 15:00, but it is a guess unless the part of day says so
+    hour = int(match.group(1))
+    if hour > 23:
+        return None, [], 0.0
+    if part is not None and part.group(1).lower() in ('afternoon', 'evening') and hour < 12:
+        return datetime.time(hour + 12), spans, 1.0
+    if part is not None and part.group(1).lower() == 'morning' and hour < 12:
+        return datetime.time(hour), spans, 1.0
+    if 1 <= hour <= 7:
+        hour += 12
+    return datetime.time(hour), spans, 0.6
+
+def _resolve_duration(match) -> datetime.timedelta:
+    amount, unit = match.group(1).lower(), match.group(2).lower()
+    if amount == 'half an':
+        value = 0.5
+    elif amount in ('a', 'an'):
+        value = 1
+    else:
+        value = int(amount)
+    if unit.startswith('h'):
+        return datetime.timedelta(hours=value)
+    return datetime.timedelta(minutes=value)
+
+def _title(text: str, spans: list) -> str:
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + " " + text[end:]
+    words = text.split()
+    while words and words[-1].lower() in TRAILING_FILLER:
+        words.pop()
+    while words and words[0].lower() in TRAILING_FILLER:
+        words.pop(0)
+    title = " ".join(words).strip(" ,.!-")
+    return title[:1].upper() + title[1:]
+
+def parse_locally(text: str, now: datetime.datetime, task_lists: list = None) -> LocalParse | None:
+    """
+    Rule-based parser for short English phrases such as "Meeting with team at 2pm",
+    "Call mom tomorrow" or "Buy milk".
+
+    Produces the same JSON shape as the LLM (naive ISO times in the user's
+    timezone, `now` being the user's current time) with a confidence score;
+    anything it does not fully understand gets a low confidence. Tasks always
+    go to "@default", so with several `task_lists` to route between they get
+    a low confidence too.
+    """
+    if not text or '?' in text or RELATIVE_TO_NOW.search(text.lower()):
+        return None
+    if not text.isascii():
+        # The rules only know English; "Встреча завтра в 15:00" would lose its "tomorrow"
+        return None
+
+    prefix = PREFIX.match(text)
+    body = text[prefix.end():] if prefix else text
+    spans = []
+    confidence = 1.0
+
+    day_match = _single(DAY, body)
+    if day_match is False:
+        return None
+    day = None
+    if day_match is not None:
+        day, day_confidence = _resolve_day(day_match, now)
+        confidence = min(confidence, day_confidence)
+        spans.append(day_match.span())
+
+    time_of_day, time_spans, time_confidence = _resolve_time(body)
+    if time_confidence == 0.0:
+        return None
+    confidence = min(confidence, time_confidence)
+    spans.extend(time_spans)
+    if day_match is not None and day_match.group(1).lower() == 'tonight' and time_of_day is None:
+        time_of_day = datetime.time(PARTS_OF_DAY['tonight'])
+
+    duration = datetime.timedelta(hours=1)
+    duration_match = _single(DURATION, body)
+    if duration_match is False:
+        return None
+    if duration_match is not None:
+        duration = _resolve_duration(duration_match)
+        spans.append(duration_match.span())
+
+    title = _title(body, spans)
+    words = [w.strip(",.!").lower() for w in title.split()]
+    if not title:
+        return None
+    if any(any(c.isdigit() for c in w) for w in words) or UNSUPPORTED.intersection(words):
+        confidence = min(confidence, 0.3)
+    if len(words) > MAX_TITLE_WORDS:
+        confidence = min(confidence, 0.6)
+    if LIST_SEPARATOR.search(title) or JOINED_ACTION.search(title):
+        # "buy milk, call the bank" is several intents; only the LLM splits them
+        confidence = min(confidence, 0.3)
+
+    if time_of_day is not None:
+        start = datetime.datetime.combine(day or now.date(), time_of_day)
+        if day is None and start < now.replace(tzinfo=None):
+            # "at 9am" said at noon: later today has passed, tomorrow is a guess
+            start += datetime.timedelta(days=1)
+            confidence = min(confidence, 0.5)
+        return LocalParse({
+            "type": "event",
+            "summary": title,
+            "start": start.isoformat(),
+            "end": (start + duration).isoformat(),
+            "description": "",
+            "recurrence": [],
+            "reminders": {"useDefault": True},
+        }, confidence)
+
+    if duration_match is not None:
+        # A duration without a start time is not something we can place
+        return None
+    due = datetime.datetime.combine(day, datetime.time(PARTS_OF_DAY['morning'])).isoformat() if day else None
+    if task_lists and len(task_lists) > 1:
+        # Picking the project list by topic is the LLM's job
+        confidence = min(confidence, 0.5)
+    return LocalParse({
+        "type": "task",
+        "title": title,
+        "notes": "",
+        "due": due,
+        "list_id": "@default",
+    }, confidence)
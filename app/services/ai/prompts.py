@@ -1,67 +1,59 @@
 import datetime
+import re
 
-class PromptManager:
-    @staticmethod
-    def generate_system_prompt(text: str, user_timezone: str, task_lists: list = None) -> str:
-        current_time = datetime.datetime.now().isoformat()
-        
-        # Format task lists for the prompt
-        lists_prompt = ""
-        if task_lists:
-            lists_prompt = "Available Task Lists and their likely topics:\n"
-            for l in task_lists:
-                extra_context = ""
-                title_lower = l['title'].lower()
-                if "finlivo" in title_lower:
-                    extra_context = "(Keywords: backend, api, database, auth, python, server, livo, code)"
-                elif "finapp" in title_lower:
-                    extra_context = "(Keywords: frontend, app, ui, client, general)"
-                elif "sms" in title_lower:
-                    extra_context = "(Keywords: message, gateway, tcell, distribution)"
-                
-                lists_prompt += f"- ID: '{l['id']}', Name: '{l['title']}' {extra_context}\n"
-            
-            lists_prompt += "\nIf 'type' is 'task':\n"
-            lists_prompt += "1. Analyze the text for project-specific keywords (e.g. 'api' -> FinLivo).\n"
-            lists_prompt += "2. You MUST choose the most relevant 'list_id' from above based on context, even if the user didn't say the exact list name.\n"
-            lists_prompt += "3. If strictly personal or unclear, use '@default'."
-        
-        return f"""
-        You are a smart calendar and tasks assistant. 
-        Current time: {current_time}
-        User Timezone: {user_timezone}
-        
-        {lists_prompt}
+# Identical for every request, so the provider can reuse its cached prefix.
+SYSTEM_PROMPT = """You are a calendar and tasks assistant. Extract the intent of the user's text.
+
+Input lines: "Now" (current local time and timezone), optional "Lists" (task lists as id=name [topic keywords]), "Text".
+
+An EVENT happens at a specific time (e.g. a meeting). A TASK is something to do (e.g. "buy milk"), usually without a duration.
+
+Reply {"items": [...]}, one EVENT or TASK per separate request:
+EVENT: {"type": "event", "summary": "Short title", "start": "YYYY-MM-DDTHH:MM:SS", "end": "YYYY-MM-DDTHH:MM:SS", "description": "Details", "recurrence": ["RRULE..."] or [], "reminders": {"useDefault": false, "overrides": [...]}}
+TASK: {"type": "task", "title": "Short title", "notes": "Extra details", "due": "YYYY-MM-DDTHH:MM:SS" or null, "list_id": "list id or @default"}
 
-        Extract the intent from the user's text: "{text}"
+Rules:
+- Times are local to the user's timezone. "Tomorrow" means +1 day. "Evening" = 18:00.
+- A task due "tomorrow" is due tomorrow morning.
+- For tasks, pick the most relevant list_id from Lists by topic, even if the list is not named. Use "@default" if personal or unclear.
+- Output strictly JSON."""
 
-        Determine if this is a CALENDAR EVENT (happens at a specific time, like a meeting) or a TASK (something to do, like "buy milk", usually without a specific duration).
+# Topic hints for the known project lists
+LIST_KEYWORDS = {
+    "finlivo": "backend,api,database,auth,python,server,livo,code",
+    "finapp": "frontend,app,ui,client",
+    "sms": "message,gateway,tcell,distribution",
+}
 
-        Return a VALID JSON object.
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
 
-        ### Option 1: It is an EVENT
-        {{
-            "type": "event",
-            "summary": "Short title",
-            "start": "ISO 8601 (YYYY-MM-DDTHH:MM:SS)",
-            "end": "ISO 8601",
-            "description": "Details",
-            "recurrence": ["RRULE..."] or [],
-            "reminders": {{ "useDefault": false, "overrides": [...] }}
-        }}
+def estimate_tokens(text: str) -> int:
+    """Rough token count (words and punctuation), enough to track prompt size."""
+    return len(TOKEN_PATTERN.findall(text))
 
-        ### Option 2: It is a TASK
-        {{
-            "type": "task",
-            "title": "Short title (e.g. Buy Milk)",
-            "notes": "Any extra details",
-            "due": "ISO 8601 (YYYY-MM-DDTHH:MM:SS) Optional. If user says 'tomorrow', set to tomorrow morning.",
-            "list_id": "ID of the list (or '@default')"
-        }}
+class PromptManager:
+    @staticmethod
+    def format_lists(task_lists: list = None) -> str:
+        entries = []
+        for l in task_lists or []:
+            title_lower = l.title.lower()
+            hint = next((kw for name, kw in LIST_KEYWORDS.items() if name in title_lower), None)
+            entries.append(f"{l.id}={l.title}" + (f" [{hint}]" if hint else ""))
+        return "; ".join(entries)
+
+    @staticmethod
+    def generate_user_message(text: str, user_timezone: str, task_lists: list = None, now: datetime.datetime = None) -> str:
+        """The per-request part of the prompt: current time, list index and the text."""
+        now = now or datetime.datetime.now()
+        lines = [f"Now: {now.strftime('%Y-%m-%dT%H:%M %a')} {user_timezone}"]
+        if task_lists:
+            lines.append(f"Lists: {PromptManager.format_lists(task_lists)}")
+        lines.append(f"Text: {text}")
+        return "\n".join(lines)
 
-        Time Rules:
-        - "Tomorrow" means +1 day.
-        - "Evening" = 18:00.
-        
-        Output strictly JSON.
-        """
+    @staticmethod
+    def build_messages(text: str, user_timezone: str, task_lists: list = None, now: datetime.datetime = None) -> list:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": PromptManager.generate_user_message(text, user_timezone, task_lists, now)},
+        ]
@@ -0,0 +1,153 @@
+import asyncio
+import collections
+import logging
+import time
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half-open", OPEN: "open"}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds; then lets one trial call through (half-open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self.clock = time.monotonic
+        self.state_gauge = metrics.gauge(f"groq_{name}_circuit_state", f"{name} circuit breaker (0 closed, 1 half-open, 2 open)")
+        self.opened = metrics.counter(f"groq_{name}_circuit_opened_total", f"Times the {name} circuit breaker opened")
+
+    def _set_state(self, state: int):
+        if state != self.state:
+            logger.warning(f"🔌 {self.name} circuit {STATE_NAMES[self.state]} → {STATE_NAMES[state]}")
+        self.state = state
+        self.state_gauge.set(state)
+
+    def allow(self) -> bool:
+        if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+        return self.state != OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self._trial_running = False
+        self._set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+            if self.state != OPEN:
+                self.opened.inc()
+            self._set_state(OPEN)
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls."""
+
+    def __init__(self, size: int = 200):
+        self.samples = collections.deque(maxlen=size)
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self.samples) < 20:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ResilientCaller:
+    """
+    Wraps model calls with a latency budget, p95-based hedging and a circuit
+    breaker per tier.
+
+    If a call has not answered after the tier's recent p95 latency (at least
+    `hedge_min_delay`), an identical second request is sent and whichever
+    answers first wins. Calls that fail or run out of budget count towards
+    the breaker; while it is open the tier is skipped.
+    """
+
+    def __init__(self, tiers, budget: float = 10.0, hedge_min_delay: float = 1.5,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self.budget = budget
+        self.hedge_min_delay = hedge_min_delay
+        self.breakers = {tier: CircuitBreaker(tier, failure_threshold, reset_timeout) for tier in tiers}
+        self.latency = {tier: LatencyWindow() for tier in tiers}
+        self.hedges = metrics.counter("groq_hedged_requests_total", "Second requests sent because the first exceeded p95 latency")
+        self.hedge_wins = metrics.counter("groq_hedge_wins_total", "Hedged requests that answered before the original")
+        self.budget_exceeded = metrics.counter("groq_latency_budget_exceeded_total", "Calls abandoned after GROQ_LATENCY_BUDGET_SECONDS")
+
+    def available(self, tier: str) -> bool:
+        breaker = self.breakers[tier]
+        return breaker.state != OPEN or breaker.clock() - breaker.opened_at >= breaker.reset_timeout
+
+    def hedge_delay(self, tier: str) -> float:
+        p95 = self.latency[tier].percentile(0.95)
+        return max(self.hedge_min_delay, p95 or 0.0)
+
+    async def _hedged(self, make_request, delay: float):
+        first = asyncio.ensure_future(make_request())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges.inc()
+                tasks.add(asyncio.ensure_future(make_request()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins.inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, tier: str, make_request):
+        breaker = self.breakers[tier]
+        if not breaker.allow():
+            raise CircuitOpenError(f"{tier} circuit is open")
+
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.budget):
+                result = await self._hedged(make_request, self.hedge_delay(tier))
+        except TimeoutError:
+            self.budget_exceeded.inc()
+            breaker.record_failure()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # The caller went away (e.g. superseded); not the model's fault
+            breaker._trial_running = False
+            raise
+
+        breaker.record_success()
+        self.latency[tier].observe(time.perf_counter() - started)
+        return result
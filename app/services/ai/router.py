@@ -0,0 +1,93 @@
+import datetime
+import logging
+import re
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TIERS = ('small', 'large', 'fallback')
+
+# Phrases the small model tends to get wrong
+COMPLEX_PATTERN = re.compile(
+    r"\b(every|daily|weekly|monthly|yearly|weekdays|until|except|unless|between|instead|reschedule|move|cancel)\b"
+    r"|\band then\b|\bas well as\b",
+    re.I
+)
+MAX_SIMPLE_WORDS = 20
+
+def is_complex(text: str) -> bool:
+    """Long, multi-sentence, recurring or non-English input goes straight to the large model."""
+    if len(text.split()) > MAX_SIMPLE_WORDS or not text.isascii():
+        return True
+    if len(re.findall(r"[.!?;](\s|$)", text.strip() + " ")) > 1:
+        return True
+    return COMPLEX_PATTERN.search(text) is not None
+
+def _is_datetime(value) -> bool:
+    try:
+        datetime.datetime.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def validate_parse(result, task_lists: list = None) -> bool:
+    """Checks that a parse_event result has the shape the handlers rely on."""
+    if not isinstance(result, dict):
+        return False
+    if result.get('type') == 'event':
+        if not isinstance(result.get('summary'), str) or not result['summary'].strip():
+            return False
+        if not _is_datetime(result.get('start')) or not _is_datetime(result.get('end')):
+            return False
+        return datetime.datetime.fromisoformat(result['end']) >= datetime.datetime.fromisoformat(result['start'])
+    if result.get('type') == 'task':
+        if not isinstance(result.get('title'), str) or not result['title'].strip():
+            return False
+        if result.get('due') and not _is_datetime(result['due']):
+            return False
+        list_id = result.get('list_id', '@default')
+        return list_id == '@default' or task_lists is None or any(l.id == list_id for l in task_lists)
+    return False
+
+def normalize_intents(result) -> list | None:
+    """Turns a model answer ({"items": [...]} or a bare object) into a list of intents."""
+    if isinstance(result, dict) and isinstance(result.get('items'), list):
+        items = [item for item in result['items'] if isinstance(item, dict)]
+        return items or None
+    if isinstance(result, dict) and 'type' in result:
+        return [result]
+    return None
+
+def validate_intents(items, task_lists: list = None) -> bool:
+    return bool(items) and all(validate_parse(item, task_lists) for item in items)
+
+class ModelRouter:
+    """
+    Picks the model tier for a request and keeps per-tier stats.
+
+    Simple requests go to the small model; when its answer fails validation
+    (or the call fails) the request is escalated to the large model. The
+    fallback model is only used when the large one is unavailable.
+    """
+
+    def __init__(self, small_model: str, large_model: str, fallback_model: str = None):
+        self.models = {'small': small_model, 'large': large_model, 'fallback': fallback_model or large_model}
+        self.latency = {tier: metrics.summary(f"ai_tier_{tier}_seconds", f"Latency of {tier}-model parse calls") for tier in TIERS}
+        self.requests = {tier: metrics.counter(f"ai_tier_{tier}_requests_total", f"parse calls sent to the {tier} model") for tier in TIERS}
+        self.escalations = metrics.counter("ai_escalations_total", "Small-model answers that were escalated to the large model")
+        self.escalation_rate = metrics.gauge("ai_escalation_rate", "Share of small-model requests escalated to the large model")
+
+    def first_tier(self, text: str) -> str:
+        if self.models['small'] == self.models['large'] or is_complex(text):
+            return 'large'
+        return 'small'
+
+    def record(self, tier: str, seconds: float):
+        self.requests[tier].inc()
+        self.latency[tier].observe(seconds)
+        logger.info(f"🧭 {tier} model ({self.models[tier]}) answered in {seconds:.2f}s")
+
+    def record_escalation(self, reason: str):
+        self.escalations.inc()
+        self.escalation_rate.set(self.escalations.value / max(self.requests['small'].value, 1))
+        logger.info(f"⬆️ Escalating to {self.models['large']}: {reason}")
@@ -1,64 +1,241 @@
+import asyncio
+import copy
+import datetime
+import inspect
 import json
 import logging
-import os
+import time
+from zoneinfo import ZoneInfo
+from app.core import config
+from app.core.metrics import metrics
+from app.services.ai.audio import SAMPLE_RATE, decode_to_pcm, ffmpeg_available, pcm_to_wav, split_on_silence
+from app.services.ai.cache import create_response_cache, is_cacheable, make_key, normalize_text
 from app.services.ai.client import groq_client
+from app.services.ai.local_parser import parse_locally
 from app.services.ai.prompts import PromptManager
+from app.services.ai.resilience import ResilientCaller
+from app.services.ai.router import TIERS, ModelRouter, normalize_intents, validate_intents
+from app.services.ai.singleflight import SingleFlight, prompt_key
 
 logger = logging.getLogger(__name__)
 
+prompt_tokens = metrics.summary("groq_prompt_tokens", "Prompt tokens billed per parse_event call")
+chunked_notes = metrics.counter("ai_voice_chunked_total", "Long voice notes transcribed in parallel chunks")
+voice_chunks = metrics.counter("ai_voice_chunks_total", "Chunks sent to Whisper for long voice notes")
+local_fallbacks = metrics.counter("ai_local_fallbacks_total", "Messages answered by the rule-based parser because every model failed")
+local_parses = metrics.counter("ai_local_parses_total", "Messages answered by the rule-based parser without an LLM call")
+
+class SupersededError(Exception):
+    """Raised when a user's request was cancelled because they sent a newer message."""
+
 class AIService:
     def __init__(self):
         self.wrapper = groq_client
+        self.cache = create_response_cache()
+        self.flights = SingleFlight("ai_parse")
+        self.router = ModelRouter(self.wrapper.small_model, self.wrapper.text_model, self.wrapper.fallback_model)
+        self.resilience = ResilientCaller(
+            TIERS,
+            budget=config.settings.GROQ_LATENCY_BUDGET_SECONDS,
+            hedge_min_delay=config.settings.GROQ_HEDGE_MIN_DELAY_SECONDS,
+            failure_threshold=config.settings.GROQ_BREAKER_FAILURES,
+            reset_timeout=config.settings.GROQ_BREAKER_RESET_SECONDS
+        )
+        # {user_id: (normalized text, {asyncio.Task})} of the user's current LLM request
+        self._inflight = {}
 
-    async def parse_event(self, text: str, user_timezone: str = "Asia/Dushanbe", task_lists: list = None):
+    def cancel(self, user_id, text: str = None) -> bool:
         """
-        Parses text into JSON Event/Task using Groq.
+        Cancels the user's in-flight LLM request, if any. The same text again
+        (a double-send or a forward to another chat) does not cancel it: both
+        share one call instead.
         """
+        entry = self._inflight.get(user_id)
+        if entry is None or (text is not None and normalize_text(text) == entry[0]):
+            return False
+        pending = [task for task in entry[1] if not task.done()]
+        for task in pending:
+            task.cancel()
+        return bool(pending)
+
+    async def _run_for_user(self, user_id, coro, text: str):
+        """Runs `coro` as the user's in-flight request, replacing any previous one for other text."""
+        if user_id is None:
+            return await coro
+
+        self.cancel(user_id, text)
+        key = normalize_text(text)
+        entry = self._inflight.get(user_id)
+        if entry is None or entry[0] != key:
+            entry = self._inflight[user_id] = (key, set())
+        task = asyncio.ensure_future(coro)
+        entry[1].add(task)
         try:
-            client = self.wrapper.get_client()
-            prompt = PromptManager.generate_system_prompt(text, user_timezone, task_lists)
-            
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.wrapper.text_model,
-                temperature=0.1,
-                response_format={"type": "json_object"},
-            )
-            
-            response_content = chat_completion.choices[0].message.content
-            return json.loads(response_content)
-            
+            return await task
+        except asyncio.CancelledError:
+            if task.cancelled() and not asyncio.current_task().cancelling():
+                raise SupersededError()
+            raise
+        finally:
+            entry[1].discard(task)
+            if not entry[1] and self._inflight.get(user_id) is entry:
+                del self._inflight[user_id]
+
+    async def _complete(self, tier: str, messages: list):
+        started = time.perf_counter()
+        chat_completion = await self.resilience.call(tier, lambda: self.wrapper.chat(
+            messages=messages,
+            model=self.router.models[tier],
+            temperature=0.1,
+            response_format={"type": "json_object"},
+        ))
+        self.router.record(tier, time.perf_counter() - started)
+
+        usage = getattr(chat_completion, "usage", None)
+        if usage is not None:
+            prompt_tokens.observe(usage.prompt_tokens)
+
+        response_content = chat_completion.choices[0].message.content
+        return json.loads(response_content)
+
+    async def _parse_event(self, text: str, messages: list, task_lists: list):
+        tried = set()
+        if self.router.first_tier(text) == 'small' and self.resilience.available('small'):
+            tried.add(self.router.models['small'])
+            try:
+                items = normalize_intents(await self._complete('small', messages))
+                if validate_intents(items, task_lists):
+                    return items
+                self.router.record_escalation("invalid JSON")
+            except Exception as e:
+                self.router.record_escalation(f"small model failed: {e}")
+
+        for tier in ('large', 'fallback'):
+            # Never re-ask a model whose answer was just rejected or failed
+            if self.router.models[tier] in tried:
+                continue
+            tried.add(self.router.models[tier])
+            try:
+                items = normalize_intents(await self._complete(tier, messages))
+                # The large model is the last word; a fallback answer must pass validation
+                if items and (tier == 'large' or validate_intents(items, task_lists)):
+                    return items
+                logger.error(f"Groq Text Parsing Error ({tier}): no valid intents in answer")
+            except Exception as e:
+                logger.error(f"Groq Text Parsing Error ({tier}): {e}")
+        return None
+
+    async def parse_event(self, text: str, user_timezone: str = "Asia/Dushanbe", task_lists: list = None, user_id: int = None):
+        """
+        Parses text into a list of Event/Task intents (one per thing the user
+        asked for), locally when the rule-based parser is confident and with
+        Groq otherwise.
+        Raises SupersededError if the same user sends a newer message meanwhile.
+        """
+        now = datetime.datetime.now(ZoneInfo(user_timezone))
+        if config.settings.LOCAL_PARSER_ENABLED:
+            local = parse_locally(text, now, task_lists)
+            if local is not None and local.confidence >= config.settings.LOCAL_PARSER_MIN_CONFIDENCE:
+                local_parses.inc()
+                return [local.result]
+
+        key = make_key(text, user_timezone, task_lists, now) if is_cacheable(text) else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        messages = PromptManager.build_messages(text, user_timezone, task_lists, now)
+        # Identical prompts in flight at the same time share one Groq call
+        flight = self.flights.do(prompt_key(messages), lambda: self._parse_event(text, messages, task_lists))
+
+        started = time.perf_counter()
+        result = await self._run_for_user(user_id, flight, text)
+        if key is not None and result is not None:
+            self.cache.set(key, result, time.perf_counter() - started)
+        if result is None:
+            # Groq is unavailable: a plausible local guess beats "couldn't understand"
+            local = parse_locally(text, now, task_lists)
+            if local is not None and local.confidence >= config.settings.LOCAL_PARSER_FALLBACK_MIN_CONFIDENCE:
+                local_fallbacks.inc()
+                result = [{**local.result, "guessed": True}]
+        # Coalesced callers got the same object; each keeps its own copy
+        return copy.deepcopy(result)
+
+    async def _await_lists(self, task_lists):
+        if not inspect.isawaitable(task_lists):
+            return task_lists
+        try:
+            return await task_lists
         except Exception as e:
-            logger.error(f"Groq Text Parsing Error: {e}")
+            logger.warning(f"⚠️ Could not fetch task lists for voice note: {e}")
             return None
 
-    async def parse_audio(self, audio_path: str):
-         """Transcribes voice note using Whisper, then parses text."""
-         
-         try:
-            client = self.wrapper.get_client()
-            
+    async def _transcribe_request(self, filename: str, data: bytes) -> str:
+        params = {}
+        if config.settings.WHISPER_LANGUAGE:
+            params['language'] = config.settings.WHISPER_LANGUAGE
+        transcription = await self.wrapper.transcribe(
+            file=(filename, data),
+            model=self.wrapper.audio_model,
+            response_format="json",
+            temperature=0.0,
+            **params
+        )
+        return transcription.text or ""
+
+    async def transcribe_pcm(self, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> str:
+        """Splits 16-bit mono PCM at silences and transcribes the chunks in parallel, keeping their order."""
+        chunks = await asyncio.to_thread(
+            split_on_silence, pcm, sample_rate,
+            config.settings.VOICE_CHUNK_SECONDS, config.settings.VOICE_CHUNK_MAX_SECONDS
+        )
+        semaphore = asyncio.Semaphore(config.settings.VOICE_CHUNK_CONCURRENCY)
+
+        async def transcribe_chunk(index, chunk):
+            async with semaphore:
+                return await self._transcribe_request(f"chunk_{index}.wav", pcm_to_wav(chunk, sample_rate))
+
+        texts = await asyncio.gather(*(transcribe_chunk(i, c) for i, c in enumerate(chunks)))
+        chunked_notes.inc()
+        voice_chunks.inc(len(chunks))
+        return " ".join(t.strip() for t in texts if t.strip())
+
+    async def transcribe(self, audio, filename: str = "voice.ogg", duration: float = None) -> str:
+        """Transcribes a voice note; notes longer than VOICE_CHUNK_MIN_SECONDS are chunked."""
+        data = audio.getvalue() if hasattr(audio, "getvalue") else audio
+        if duration and duration > config.settings.VOICE_CHUNK_MIN_SECONDS:
+            if ffmpeg_available():
+                return await self.transcribe_pcm(await decode_to_pcm(data))
+            logger.warning("⚠️ ffmpeg not found, sending long voice note in one request")
+        return await self._transcribe_request(filename, data)
+
+    async def parse_audio(self, audio, filename: str = "voice.ogg", duration: float = None,
+                          task_lists=None, user_id: int = None):
+        """
+        Transcribes an in-memory voice note (bytes or BytesIO) using Whisper, then parses text.
+        `task_lists` may be an awaitable; it is only awaited after transcription,
+        so fetching the lists overlaps with the Whisper call.
+        """
+        try:
             # 1. Transcribe
-            with open(audio_path, "rb") as file:
-                transcription = client.audio.transcriptions.create(
-                    file=(os.path.basename(audio_path), file.read()),
-                    model=self.wrapper.audio_model,
-                    response_format="json",
-                    language="en", 
-                    temperature=0.0
-                )
-            
-            text = transcription.text
+            text = await self.transcribe(audio, filename, duration)
             logger.info(f"Groq Whisper Transcribed: {text}")
-            
+
             # 2. Parse Intent
             if text:
-                return await self.parse_event(text)
+                lists = await self._await_lists(task_lists)
+                return await self.parse_event(text, task_lists=lists, user_id=user_id)
+            return None
+
+        except SupersededError:
+            raise
+        except Exception as e:
+            logger.error(f"Groq Audio Error: {e}")
             return None
-            
-         except Exception as e:
-             logger.error(f"Groq Audio Error: {e}")
-             return None
+        finally:
+            if isinstance(task_lists, asyncio.Future) and not task_lists.done():
+                task_lists.cancel()
 
 # Singleton instance
 ai_service = AIService()
@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+import json
+from app.core.metrics import metrics
+
+def prompt_key(messages: list) -> str:
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+
+class _Call:
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one in-flight task.
+
+    Every caller awaits the shared task through a shield, so a cancelled
+    caller (e.g. superseded by a newer message) does not cancel it for the
+    others; the task is only cancelled once all of its callers are gone.
+    """
+
+    def __init__(self, name: str):
+        self._calls = {}
+        self.saved = metrics.counter(f"{name}_coalesced_calls_total", f"{name} calls answered by an identical in-flight call")
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key: str, factory):
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(factory()))
+        else:
+            self.saved.inc()
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0:
+                if not call.task.done():
+                    call.task.cancel()
+                if self._calls.get(key) is call:
+                    del self._calls[key]
@@ -0,0 +1,100 @@
+import asyncio
+import datetime
+import heapq
+import logging
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+from app.core import config
+from app.core.cache import TTLCache
+from app.services.calendar.models import CalendarEvent
+from app.services.calendar.service import calendar_service, async_calendar_service
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {
+    'today': "Today",
+    'tomorrow': "Tomorrow",
+    'week': "This Week",
+}
+
+@dataclass
+class AgendaPage:
+    window: str
+    page: int
+    total_pages: int
+    events: list
+    calendar_names: dict
+
+def window_bounds(window: str, tz: ZoneInfo, now: datetime.datetime = None) -> tuple:
+    """Returns the [start, end) range of a named agenda window in the user's timezone."""
+    now = (now or datetime.datetime.now(tz)).astimezone(tz)
+    today = datetime.datetime.combine(now.date(), datetime.time.min, tzinfo=tz)
+    if window == 'today':
+        return now, today + datetime.timedelta(days=1)
+    if window == 'tomorrow':
+        return today + datetime.timedelta(days=1), today + datetime.timedelta(days=2)
+    if window == 'week':
+        return now, today + datetime.timedelta(days=7)
+    raise ValueError(f"Unknown agenda window: {window}")
+
+class AgendaEngine:
+    """
+    Builds the agenda across all of the user's calendars.
+
+    Every selected calendar is synced concurrently, the per-calendar event
+    lists (already sorted by start) are heap-merged into a single stream, and
+    the merged snapshot is cached so later pages do not hit Google again.
+    """
+
+    def __init__(self, service, async_service, page_size: int = 10, cache_ttl: float = 300):
+        self.service = service
+        self.async_service = async_service
+        self.page_size = page_size
+        self.tz = ZoneInfo(config.settings.USER_TIMEZONE)
+        self.cache = TTLCache("agenda", ttl=cache_ttl, max_size=16)
+
+    async def _collect(self, window: str):
+        start, end = window_bounds(window, self.tz)
+        calendars = await self.async_service.list_calendars()
+
+        results = await asyncio.gather(
+            *(self.async_service.sync_calendar(c.id) for c in calendars), return_exceptions=True
+        )
+        streams = []
+        for calendar, result in zip(calendars, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Skipping calendar {calendar.summary}: {result}")
+                continue
+            streams.append(self.service.get_sync_store(calendar.id).window(start, end))
+
+        merged = list(heapq.merge(*streams, key=lambda e: (e.start, e.id)))
+        names = {c.id: c.summary for c in calendars if not c.primary}
+        return merged, names
+
+    async def get_page(self, window: str = 'week', page: int = 0, refresh: bool = False) -> AgendaPage:
+        key = (window, datetime.datetime.now(self.tz).date())
+        snapshot = None if refresh else self.cache.get(key)
+        if snapshot is None:
+            snapshot = await self._collect(window)
+            self.cache.set(key, snapshot)
+
+        events, names = snapshot
+        total_pages = max(1, -(-len(events) // self.page_size))
+        page = min(max(page, 0), total_pages - 1)
+        chunk = events[page * self.page_size:(page + 1) * self.page_size]
+        return AgendaPage(window, page, total_pages, chunk, names)
+
+    def invalidate(self):
+        self.cache.invalidate()
+
+def format_event_time(event: CalendarEvent, tz: ZoneInfo) -> str:
+    if event.all_day:
+        return event.start.strftime('%a %d %b') + " (all day)"
+    return event.start.astimezone(tz).strftime('%a %d %b %H:%M')
+
+# Singleton
+agenda_engine = AgendaEngine(
+    calendar_service, async_calendar_service,
+    page_size=config.settings.AGENDA_PAGE_SIZE,
+    cache_ttl=config.settings.AGENDA_CACHE_TTL
+)
@@ -0,0 +1,122 @@
+import bisect
+import datetime
+import logging
+import threading
+import time
+from app.core.metrics import metrics
+from app.services.google.retry import request_executor
+
+logger = logging.getLogger(__name__)
+
+freebusy_queries = metrics.counter("calendar_freebusy_queries_total", "freebusy.query calls made to fill the busy-interval cache")
+conflict_checks = metrics.counter("calendar_conflict_checks_total", "Proposed events checked against cached busy intervals")
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping busy intervals.
+
+    Overlapping intervals are merged on insert, so an overlap query is a
+    binary search plus a walk over the (few) intervals that actually overlap.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start: datetime.datetime, end: datetime.datetime):
+        # First interval that could touch [start, end]
+        i = bisect.bisect_left(self.ends, start)
+        j = i
+        while j < len(self.starts) and self.starts[j] <= end:
+            start = min(start, self.starts[j])
+            end = max(end, self.ends[j])
+            j += 1
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+    def overlapping(self, start: datetime.datetime, end: datetime.datetime) -> list:
+        i = bisect.bisect_right(self.ends, start)
+        result = []
+        while i < len(self.starts) and self.starts[i] < end:
+            result.append((self.starts[i], self.ends[i]))
+            i += 1
+        return result
+
+class FreeBusyCache:
+    """
+    Per-user busy intervals from freebusy.query, kept in an IntervalIndex.
+
+    One query covers `horizon_days` ahead and all of the user's calendars;
+    conflict checks inside that window are answered locally until the entry
+    expires or calendar changes invalidate it.
+    """
+
+    def __init__(self, client, ttl: float = 600, horizon_days: int = 14):
+        self.client = client
+        self.ttl = ttl
+        self.horizon = datetime.timedelta(days=horizon_days)
+        self._entries = {}
+        # Bumped by add_busy/invalidate; a query that raced with one is not cached
+        self._changes = 0
+        self._lock = threading.Lock()
+
+    def _query(self, calendar_ids: list, start: datetime.datetime, end: datetime.datetime) -> IntervalIndex:
+        service = self.client.get_service()
+        body = {
+            'timeMin': start.isoformat(),
+            'timeMax': end.isoformat(),
+            'items': [{'id': calendar_id} for calendar_id in calendar_ids],
+        }
+        response = request_executor.execute(service.freebusy().query(body=body), api='calendar')
+        freebusy_queries.inc()
+
+        index = IntervalIndex()
+        for calendar_id, info in response.get('calendars', {}).items():
+            if info.get('errors'):
+                logger.warning(f"⚠️ Free/busy unavailable for {calendar_id}: {info['errors']}")
+            for busy in info.get('busy', []):
+                index.add(datetime.datetime.fromisoformat(busy['start']), datetime.datetime.fromisoformat(busy['end']))
+        return index
+
+    def find_conflicts(self, user_id, calendar_ids: list, start: datetime.datetime, end: datetime.datetime) -> list:
+        """Returns cached busy intervals overlapping [start, end), querying Google only on a cache miss."""
+        conflict_checks.inc()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            fresh = entry is not None and entry['expires_at'] > time.monotonic()
+            if fresh and entry['start'] <= start and end <= entry['end']:
+                return entry['index'].overlapping(start, end)
+            changes = self._changes
+
+        # Queried without the lock, so other checks and add_busy do not wait behind the network
+        window_start = min(datetime.datetime.now(datetime.timezone.utc), start)
+        window_end = max(window_start + self.horizon, end)
+        index = self._query(calendar_ids, window_start, window_end)
+        with self._lock:
+            if self._changes == changes:
+                self._entries[user_id] = {
+                    'index': index,
+                    'start': window_start,
+                    'end': window_end,
+                    'expires_at': time.monotonic() + self.ttl,
+                }
+        return index.overlapping(start, end)
+
+    def add_busy(self, user_id, start: datetime.datetime, end: datetime.datetime):
+        """Records a newly created event so later checks see it without a new query."""
+        with self._lock:
+            self._changes += 1
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry['index'].add(start, end)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self._changes += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
@@ -0,0 +1,53 @@
+import datetime
+from dataclasses import dataclass
+from zoneinfo import ZoneInfo
+
+# Partial-response masks: only what the bot reads is downloaded
+EVENT_FIELDS = 'id,status,summary,start,end,htmlLink'
+EVENTS_LIST_FIELDS = f'nextPageToken,nextSyncToken,items({EVENT_FIELDS})'
+CALENDAR_LIST_FIELDS = 'nextPageToken,items(id,summary,summaryOverride,primary,selected)'
+
+def _parse_time(value: dict, tz: ZoneInfo) -> datetime.datetime:
+    if 'dateTime' in value:
+        return datetime.datetime.fromisoformat(value['dateTime'])
+    # All-day events start at local midnight
+    day = datetime.date.fromisoformat(value['date'])
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=tz)
+
+@dataclass(frozen=True, slots=True)
+class CalendarEvent:
+    id: str
+    summary: str
+    start: datetime.datetime
+    end: datetime.datetime
+    all_day: bool = False
+    html_link: str | None = None
+    calendar_id: str = 'primary'
+
+    @classmethod
+    def from_api(cls, item: dict, tz: ZoneInfo, calendar_id: str = 'primary') -> "CalendarEvent":
+        start = _parse_time(item['start'], tz)
+        end = _parse_time(item['end'], tz) if 'end' in item else start
+        return cls(
+            id=item['id'],
+            summary=item.get('summary', 'No Title'),
+            start=start,
+            end=end,
+            all_day='date' in item['start'],
+            html_link=item.get('htmlLink'),
+            calendar_id=calendar_id,
+        )
+
+@dataclass(frozen=True, slots=True)
+class CalendarInfo:
+    id: str
+    summary: str
+    primary: bool = False
+
+    @classmethod
+    def from_api(cls, item: dict) -> "CalendarInfo":
+        return cls(
+            id=item['id'],
+            summary=item.get('summaryOverride') or item.get('summary', item['id']),
+            primary=item.get('primary', False),
+        )
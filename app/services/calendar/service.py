@@ -1,25 +1,37 @@
 import datetime
+import logging
+from zoneinfo import ZoneInfo
+from app.core import config
+from app.core.cache import TTLCache
 from app.services.calendar.client import calendar_client
+from app.services.calendar.freebusy import FreeBusyCache
+from app.services.calendar.models import CalendarInfo, CALENDAR_LIST_FIELDS
+from app.services.calendar.sync import CalendarSyncStore
+from app.services.google.executor import AsyncServiceFacade, google_executor
+from app.services.google.retry import request_executor
+
+logger = logging.getLogger(__name__)
 
 class CalendarService:
     def __init__(self):
         self.client = calendar_client
+        self.sync_stores = {}
+        self.calendar_list_cache = TTLCache("calendar_list", ttl=config.settings.CALENDAR_LIST_CACHE_TTL)
+        self.freebusy = FreeBusyCache(self.client, ttl=config.settings.FREEBUSY_CACHE_TTL)
 
-    def create_event(self, summary: str, start_time: datetime.datetime, end_time: datetime.datetime, 
-                     description: str = "", recurrence: list = None, reminders: dict = None):
-        """Creates an event in the primary calendar."""
-        service = self.client.get_service()
-        
+    @staticmethod
+    def _event_body(summary: str, start_time: datetime.datetime, end_time: datetime.datetime,
+                    description: str = "", recurrence: list = None, reminders: dict = None) -> dict:
         event = {
             'summary': summary,
             'description': description,
             'start': {
                 'dateTime': start_time.isoformat(),
-                'timeZone': 'Asia/Dushanbe',
+                'timeZone': config.settings.USER_TIMEZONE,
             },
             'end': {
                 'dateTime': end_time.isoformat(),
-                'timeZone': 'Asia/Dushanbe',
+                'timeZone': config.settings.USER_TIMEZONE,
             },
         }
 
@@ -28,23 +40,100 @@ class CalendarService:
         
         if reminders:
             event['reminders'] = reminders
+        return event
 
-        event = service.events().insert(calendarId='primary', body=event).execute()
+    def create_event(self, summary: str, start_time: datetime.datetime, end_time: datetime.datetime, 
+                     description: str = "", recurrence: list = None, reminders: dict = None, user_id: int = None):
+        """Creates an event in the primary calendar."""
+        service = self.client.get_service()
+        event = self._event_body(summary, start_time, end_time, description, recurrence, reminders)
+
+        event = request_executor.execute(service.events().insert(calendarId='primary', body=event, fields='htmlLink'), api='calendar', idempotent=False)
+        if user_id is not None:
+            self.freebusy.add_busy(user_id, self._localize(start_time), self._localize(end_time))
         return event.get('htmlLink')
 
-    def list_events(self, max_results=10):
-        """Lists upcoming events for today and tomorrow."""
+    def create_events(self, events: list[dict], user_id: int = None) -> list:
+        """
+        Creates several events (create_event keyword dicts) in one batch request.
+        Returns (link, error) pairs in the same order.
+        """
         service = self.client.get_service()
-        
-        now = datetime.datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
-        
-        events_result = service.events().list(
-            calendarId='primary', timeMin=now,
-            maxResults=max_results, singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        events = events_result.get('items', [])
-        return events
+        requests = [
+            service.events().insert(calendarId='primary', body=self._event_body(**event), fields='htmlLink')
+            for event in events
+        ]
+        results = []
+        for event, (response, error) in zip(events, request_executor.execute_batch(service, requests, api='calendar', idempotent=False)):
+            if error is None and user_id is not None:
+                self.freebusy.add_busy(user_id, self._localize(event['start_time']), self._localize(event['end_time']))
+            results.append((response.get('htmlLink') if error is None else None, error))
+        return results
+
+    @staticmethod
+    def _localize(value: datetime.datetime) -> datetime.datetime:
+        if value.tzinfo is None:
+            return value.replace(tzinfo=ZoneInfo(config.settings.USER_TIMEZONE))
+        return value
+
+    def find_conflicts(self, start_time: datetime.datetime, end_time: datetime.datetime, user_id: int = None) -> list:
+        """Returns busy (start, end) intervals across the user's calendars that overlap the proposed event."""
+        calendar_ids = [c.id for c in self.list_calendars()]
+        return self.freebusy.find_conflicts(
+            user_id, calendar_ids, self._localize(start_time), self._localize(end_time)
+        )
+
+    def list_calendars(self) -> list[CalendarInfo]:
+        """Returns the calendars the user has selected in Google Calendar (cached)."""
+        from googleapiclient.errors import HttpError
+
+        cached = self.calendar_list_cache.get('calendars')
+        if cached is not None:
+            return cached
+
+        try:
+            calendars = self._fetch_calendars()
+        except HttpError as e:
+            if e.resp.status != 403:
+                raise
+            # Token granted before calendarlist.readonly was added: primary only until re-consent
+            logger.warning("⚠️ No access to the calendar list, run auth_refresh.py to grant it. Using primary only.")
+            calendars = [CalendarInfo(id='primary', summary='Primary', primary=True)]
+
+        self.calendar_list_cache.set('calendars', calendars)
+        return calendars
+
+    def _fetch_calendars(self) -> list[CalendarInfo]:
+        service = self.client.get_service()
+        calendars = []
+        page_token = None
+        while True:
+            request = service.calendarList().list(pageToken=page_token, fields=CALENDAR_LIST_FIELDS)
+            response = request_executor.execute(request, api='calendar')
+            calendars.extend(
+                CalendarInfo.from_api(item) for item in response.get('items', [])
+                if item.get('selected') or item.get('primary')
+            )
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        return calendars
+
+    def get_sync_store(self, calendar_id: str) -> CalendarSyncStore:
+        """Returns the local store for a calendar, keyed by its calendarList id (the email for the primary one)."""
+        store = self.sync_stores.get(calendar_id)
+        if store is None:
+            store = self.sync_stores.setdefault(calendar_id, CalendarSyncStore(self.client, calendar_id))
+        return store
+
+    def sync_calendar(self, calendar_id: str):
+        """Pulls changes for a calendar into its local store (e.g. after a push notification)."""
+        self.get_sync_store(calendar_id).sync()
 
 # Singleton
 calendar_service = CalendarService()
+
+# Awaitable view for async handlers (runs on the Google API thread pool)
+async_calendar_service = AsyncServiceFacade(
+    calendar_service, google_executor, max_concurrency=config.settings.CALENDAR_MAX_CONCURRENCY
+)
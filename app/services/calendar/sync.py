@@ -0,0 +1,142 @@
+import bisect
+import datetime
+import logging
+import threading
+from zoneinfo import ZoneInfo
+from app.core import config
+from app.core.metrics import metrics
+from app.services.calendar.models import CalendarEvent, EVENTS_LIST_FIELDS
+from app.services.google.retry import request_executor
+
+logger = logging.getLogger(__name__)
+
+sync_requests = metrics.counter("calendar_sync_requests_total", "events.list pages fetched by the sync store")
+full_syncs = metrics.counter("calendar_full_syncs_total", "Full calendar resyncs (first sync or 410 Gone)")
+changed_events = metrics.counter("calendar_sync_changed_events_total", "Events received from incremental syncs")
+
+class CalendarSyncStore:
+    """
+    Local copy of one calendar's events kept current with Google's incremental sync.
+
+    The first sync downloads the events from `lookback_days` ago to
+    `lookahead_days` ahead and stores the nextSyncToken; later syncs only
+    transfer changed events and drop the ones that left the window. When
+    Google answers 410 Gone, or half of the lookahead has passed, the token is
+    dropped and a full sync runs again.
+    """
+
+    def __init__(self, client, calendar_id: str = 'primary', lookback_days: int = 1, lookahead_days: int = None):
+        self.client = client
+        self.calendar_id = calendar_id
+        self.lookback = datetime.timedelta(days=lookback_days)
+        self.lookahead = datetime.timedelta(days=lookahead_days or config.settings.CALENDAR_SYNC_LOOKAHEAD_DAYS)
+        self.tz = ZoneInfo(config.settings.USER_TIMEZONE)
+        self.clock = lambda: datetime.datetime.now(datetime.timezone.utc)
+        self.sync_token = None
+        self.window_end = None
+        self._events = {}
+        self._index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._events)
+
+    def _list_pages(self, service, sync_token: str = None, window_end: datetime.datetime = None):
+        params = {
+            'calendarId': self.calendar_id, 'singleEvents': True, 'maxResults': 250,
+            'fields': EVENTS_LIST_FIELDS,
+        }
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            params['timeMin'] = (self.clock() - self.lookback).isoformat()
+            params['timeMax'] = window_end.isoformat()
+
+        page_token = None
+        while True:
+            request = service.events().list(pageToken=page_token, **params)
+            response = request_executor.execute(request, api='calendar')
+            sync_requests.inc()
+            yield response
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+
+    def _apply(self, events: dict, items: list):
+        for item in items:
+            if item.get('status') == 'cancelled':
+                events.pop(item['id'], None)
+            else:
+                events[item['id']] = CalendarEvent.from_api(item, self.tz, self.calendar_id)
+
+    def _full_sync(self, service):
+        full_syncs.inc()
+        events = {}
+        sync_token = None
+        window_end = self.clock() + self.lookahead
+        for response in self._list_pages(service, window_end=window_end):
+            self._apply(events, response.get('items', []))
+            sync_token = response.get('nextSyncToken', sync_token)
+        self._events = events
+        self.sync_token = sync_token
+        self.window_end = window_end
+
+    def _incremental_sync(self, service):
+        # Changes are applied to a copy so readers never see a half-applied sync
+        events = dict(self._events)
+        sync_token = self.sync_token
+        for response in self._list_pages(service, sync_token):
+            items = response.get('items', [])
+            changed_events.inc(len(items))
+            self._apply(events, items)
+            sync_token = response.get('nextSyncToken', sync_token)
+        # Sync tokens ignore timeMin/timeMax, so changes outside the window arrive too
+        window_start = self.clock() - self.lookback
+        for event_id in [i for i, e in events.items() if e.end <= window_start or e.start >= self.window_end]:
+            del events[event_id]
+        self._events = events
+        self.sync_token = sync_token
+
+    def sync(self):
+        """Brings the local copy up to date (incrementally when a sync token is known)."""
+        from googleapiclient.errors import HttpError
+
+        with self._lock:
+            service = self.client.get_service()
+            if self.sync_token is None:
+                self._full_sync(service)
+            elif self.clock() + self.lookahead / 2 > self.window_end:
+                logger.info(f"♻️ Sync window for {self.calendar_id} is running out, running full sync")
+                self._full_sync(service)
+            else:
+                try:
+                    self._incremental_sync(service)
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logger.info(f"♻️ Sync token expired for {self.calendar_id}, running full sync")
+                    self._full_sync(service)
+
+    def _sorted(self) -> list:
+        events = self._events
+        if self._index is None or self._index[0] is not events:
+            self._index = (events, sorted(events.values(), key=lambda e: (e.start, e.id)))
+        return self._index[1]
+
+    def upcoming(self, now: datetime.datetime = None, max_results: int = 10) -> list[CalendarEvent]:
+        """Returns events that have not ended yet, ordered by start time."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        result = []
+        for event in self._sorted():
+            if event.end > now:
+                result.append(event)
+                if len(result) >= max_results:
+                    break
+        return result
+
+    def window(self, start: datetime.datetime, end: datetime.datetime) -> list[CalendarEvent]:
+        """Returns events overlapping [start, end), ordered by start time."""
+        index = self._sorted()
+        # Events are ordered by start, so anything starting at/after `end` is skipped via bisect
+        stop = bisect.bisect_left(index, end, key=lambda e: e.start)
+        return [event for event in index[:stop] if event.end > start]
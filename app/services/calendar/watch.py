@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+import hmac
+import logging
+import uuid
+from dataclasses import dataclass
+from app.core import config
+from app.core.metrics import metrics
+from app.services.calendar.client import calendar_client
+from app.services.google.retry import request_executor
+
+logger = logging.getLogger(__name__)
+
+notifications_received = metrics.counter("calendar_push_notifications_total", "Calendar push notifications accepted")
+notifications_rejected = metrics.counter("calendar_push_rejected_total", "Calendar push notifications with a bad channel token")
+channel_renewals = metrics.counter("calendar_watch_renewals_total", "Calendar watch channels (re)registered")
+
+@dataclass
+class WatchChannel:
+    id: str
+    resource_id: str
+    calendar_id: str
+    expiration: datetime.datetime
+
+class WatchChannelManager:
+    """
+    Registers Google Calendar `events.watch` channels and renews them before they expire.
+
+    Every channel carries a token of the form "<secret>:<calendar_id>", so any
+    instance sharing the secret can verify a notification and knows which
+    calendar changed without a shared channel registry. Without a secret
+    (GOOGLE_PUSH_SECRET) nothing is registered and every notification is rejected.
+    """
+
+    def __init__(self, client, address: str, secret: str = None,
+                 ttl_seconds: int = 7 * 24 * 3600, renew_margin_seconds: int = 3600):
+        self.client = client
+        self.address = address
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.renew_margin = datetime.timedelta(seconds=renew_margin_seconds)
+        self.channels = {}
+        self.watched = set()
+        self._renew_task = None
+
+    def register(self, calendar_id: str) -> WatchChannel:
+        """Opens a new channel for the calendar and stops the one it replaces."""
+        if not self.secret:
+            raise ValueError("GOOGLE_PUSH_SECRET is not set")
+        self.watched.add(calendar_id)
+        service = self.client.get_service()
+        body = {
+            'id': str(uuid.uuid4()),
+            'type': 'web_hook',
+            'address': self.address,
+            'token': f"{self.secret}:{calendar_id}",
+            'params': {'ttl': str(self.ttl_seconds)},
+        }
+        response = request_executor.execute(service.events().watch(calendarId=calendar_id, body=body), api='calendar')
+        expiration = datetime.datetime.fromtimestamp(int(response['expiration']) / 1000, datetime.timezone.utc)
+        channel = WatchChannel(response['id'], response['resourceId'], calendar_id, expiration)
+
+        previous = self.channels.get(calendar_id)
+        self.channels[calendar_id] = channel
+        channel_renewals.inc()
+        logger.info(f"👀 Watching calendar {calendar_id} until {expiration}")
+
+        if previous is not None:
+            self.stop(previous)
+        return channel
+
+    def stop(self, channel: WatchChannel):
+        try:
+            service = self.client.get_service()
+            request = service.channels().stop(body={'id': channel.id, 'resourceId': channel.resource_id})
+            request_executor.execute(request, api='calendar')
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to stop watch channel {channel.id}: {e}")
+
+    def stop_all(self):
+        for channel in list(self.channels.values()):
+            self.stop(channel)
+        self.channels.clear()
+        self.watched.clear()
+
+    def parse_notification(self, headers) -> str | None:
+        """
+        Validates push notification headers.
+
+        Returns the calendar id to refresh, or None when the notification is
+        only the initial "sync" handshake or does not belong to us.
+        """
+        token = headers.get('X-Goog-Channel-Token', '')
+        secret, _, calendar_id = token.partition(':')
+        if not self.secret or not calendar_id or not hmac.compare_digest(secret, self.secret):
+            notifications_rejected.inc()
+            return None
+
+        state = headers.get('X-Goog-Resource-State')
+        if state == 'sync':
+            return None
+        notifications_received.inc()
+        return calendar_id
+
+    def next_renewal_delay(self) -> float:
+        if self.watched - self.channels.keys():
+            # A registration failed earlier; retry soon
+            return 60.0
+        if not self.channels:
+            return self.renew_margin.total_seconds()
+        earliest = min(channel.expiration for channel in self.channels.values())
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return max(0.0, (earliest - self.renew_margin - now).total_seconds())
+
+    async def _renew_forever(self, executor):
+        while True:
+            await asyncio.sleep(self.next_renewal_delay())
+            now = datetime.datetime.now(datetime.timezone.utc)
+            for calendar_id in list(self.watched):
+                channel = self.channels.get(calendar_id)
+                if channel is None or channel.expiration - self.renew_margin <= now:
+                    try:
+                        await executor.run(self.register, calendar_id)
+                    except Exception as e:
+                        logger.error(f"Failed to renew watch channel for {calendar_id}: {e}")
+
+    def start_renewal(self, executor):
+        if self._renew_task is None or self._renew_task.done():
+            self._renew_task = asyncio.create_task(self._renew_forever(executor))
+
+    def stop_renewal(self):
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+            self._renew_task = None
+
+# Singleton
+watch_manager = WatchChannelManager(
+    calendar_client,
+    address=f"{config.settings.WEBHOOK_URL}{config.settings.GOOGLE_PUSH_PATH}" if config.settings.WEBHOOK_URL else None,
+    secret=config.settings.GOOGLE_PUSH_SECRET,
+    ttl_seconds=config.settings.GOOGLE_PUSH_CHANNEL_TTL_SECONDS
+)
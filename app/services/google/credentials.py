@@ -0,0 +1,202 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import threading
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_SCOPES = [
+    'https://www.googleapis.com/auth/calendar.events',
+    'https://www.googleapis.com/auth/calendar.calendarlist.readonly',
+    'https://www.googleapis.com/auth/calendar.freebusy',
+    'https://www.googleapis.com/auth/tasks'
+]
+TASKS_SCOPES = ['https://www.googleapis.com/auth/tasks']
+
+class FileTokenStore:
+    """Keeps the authorized user token in a local JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def save(self, token_info: dict):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(token_info, f)
+        os.replace(tmp_path, self.path)
+
+class MemoryTokenStore:
+    """Stand-in for a secret store (e.g. Secret Manager) that keeps every saved version."""
+
+    def __init__(self, token_info: dict = None):
+        self.versions = [token_info] if token_info else []
+
+    def load(self) -> dict | None:
+        return self.versions[-1] if self.versions else None
+
+    def save(self, token_info: dict):
+        self.versions.append(token_info)
+
+def _expiry(token_info: dict) -> datetime.datetime:
+    try:
+        return datetime.datetime.fromisoformat(token_info['expiry'].rstrip('Z'))
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return datetime.datetime.min
+
+def create_token_store():
+    kind = config.settings.GOOGLE_TOKEN_STORE
+    if kind == "file":
+        return FileTokenStore(config.settings.GOOGLE_TOKEN_STORE_PATH or config.settings.GOOGLE_TOKEN_PATH)
+    if kind == "memory":
+        return MemoryTokenStore()
+    return None
+
+class CredentialManager:
+    """
+    Owns the single Google `Credentials` object shared by the Calendar and Tasks clients.
+
+    Tokens are refreshed ahead of expiry, concurrent refreshes are collapsed
+    into one (single-flight), and refreshed tokens are written back to the
+    token store so the next cold start does not need a refresh round trip.
+    """
+
+    def __init__(self, scopes: list, store=None, refresh_margin: float = 300):
+        self.scopes = scopes
+        self.store = store
+        self.refresh_margin = datetime.timedelta(seconds=refresh_margin)
+        self.creds = None
+        self._lock = threading.Lock()
+        self._refresh_task = None
+
+    def _load_token_info(self) -> dict | None:
+        """
+        Loads the token from GOOGLE_TOKEN_JSON and the token store, then the token file.
+
+        When both hold the same grant (refresh_token) the one that expires later
+        wins, so a token refreshed by an earlier start is reused; a different
+        grant in GOOGLE_TOKEN_JSON (re-authentication) always wins.
+        """
+        env_info = None
+        token_json = config.settings.GOOGLE_TOKEN_JSON
+        if token_json:
+            try:
+                env_info = json.loads(token_json)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse GOOGLE_TOKEN_JSON: {e}")
+
+        stored_info = None
+        if self.store is not None:
+            try:
+                stored_info = self.store.load()
+            except Exception as e:
+                logger.error(f"Failed to read token store: {e}")
+
+        if env_info and stored_info:
+            same_grant = env_info.get('refresh_token') == stored_info.get('refresh_token')
+            return stored_info if same_grant and _expiry(stored_info) > _expiry(env_info) else env_info
+        if env_info or stored_info:
+            return env_info or stored_info
+
+        token_path = config.settings.GOOGLE_TOKEN_PATH
+        if os.path.exists(token_path):
+            with open(token_path, 'r') as f:
+                return json.load(f)
+        return None
+
+    def _load(self):
+        from google.oauth2.credentials import Credentials
+
+        token_info = self._load_token_info()
+        if not token_info:
+            logger.warning("Google token missing! Set GOOGLE_TOKEN_JSON env var or provide token.json.")
+            return None
+        # Keep the scopes the token was granted: asking for newer ones in the
+        # refresh grant fails with invalid_scope and would break every call
+        scopes = None if token_info.get('scopes') else self.scopes
+        try:
+            return Credentials.from_authorized_user_info(token_info, scopes)
+        except ValueError as e:
+            logger.error(f"Invalid Google token: {e}")
+            return None
+
+    def _needs_refresh(self) -> bool:
+        if not self.creds.expiry:
+            return not self.creds.valid
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return self.creds.expiry - now < self.refresh_margin
+
+    def _refresh(self):
+        from google.auth.transport.requests import Request
+
+        self.creds.refresh(Request())
+        logger.info(f"🔑 Google token refreshed (expires {self.creds.expiry})")
+        if self.store is not None:
+            try:
+                self.store.save(json.loads(self.creds.to_json()))
+            except Exception as e:
+                logger.error(f"Failed to persist refreshed token: {e}")
+
+    def get_credentials(self):
+        """Returns valid credentials, refreshing them first if they are about to expire."""
+        creds = self.creds
+        if creds is not None and not self._needs_refresh():
+            return creds
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.creds is None:
+                self.creds = self._load()
+                if self.creds is None:
+                    return None
+            if self._needs_refresh():
+                if not self.creds.refresh_token:
+                    logger.error("Token expired and has no refresh_token. Please refresh locally and update GOOGLE_TOKEN_JSON.")
+                    return self.creds
+                try:
+                    self._refresh()
+                except Exception as e:
+                    logger.error(f"Failed to refresh token: {e}")
+            return self.creds
+
+    def seconds_until_refresh(self) -> float:
+        if self.creds is None or not self.creds.expiry:
+            return self.refresh_margin.total_seconds()
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return max(0.0, (self.creds.expiry - self.refresh_margin - now).total_seconds())
+
+    async def _auto_refresh(self, executor):
+        while True:
+            await asyncio.sleep(self.seconds_until_refresh())
+            try:
+                await executor.run(self.get_credentials)
+            except Exception as e:
+                logger.error(f"Background token refresh failed: {e}")
+            if self.creds is None or (self.creds.expiry and self._needs_refresh()):
+                # Refresh failed; retry later instead of spinning
+                await asyncio.sleep(60)
+
+    def start_background_refresh(self, executor):
+        """Starts refreshing the token in the background shortly before it expires."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._auto_refresh(executor))
+
+    def stop_background_refresh(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+# Singleton
+credential_manager = CredentialManager(
+    scopes=sorted(set(CALENDAR_SCOPES + TASKS_SCOPES)),
+    store=create_token_store(),
+    refresh_margin=config.settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS
+)
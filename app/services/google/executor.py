@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+class GoogleApiExecutor:
+    """Dedicated thread pool for blocking googleapiclient calls."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google-api")
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+class AsyncServiceFacade:
+    """
+    Exposes every public method of a sync service as a coroutine.
+
+    Calls run on the shared Google API thread pool, and at most
+    `max_concurrency` calls per service are in flight at once.
+    """
+
+    def __init__(self, service, executor: GoogleApiExecutor, max_concurrency: int):
+        self._service = service
+        self._executor = executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            async with self._semaphore:
+                return await self._executor.run(attr, *args, **kwargs)
+
+        return call
+
+    async def stream(self, method_name: str, *args, chunk_size: int = 100, **kwargs):
+        """
+        Async-iterates a generator method of the service (e.g. iter_tasks).
+
+        Items are pulled in chunks, so pages are only fetched as the consumer
+        advances; breaking out early stops paging. The generator is created,
+        advanced and closed on one dedicated thread, because googleapiclient
+        service objects are per thread and httplib2 is not thread-safe.
+        """
+        loop = asyncio.get_running_loop()
+        thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="google-api-stream")
+        gen = None
+        try:
+            gen = await loop.run_in_executor(thread, functools.partial(getattr(self._service, method_name), *args, **kwargs))
+            while True:
+                async with self._semaphore:
+                    chunk = await loop.run_in_executor(thread, lambda: list(itertools.islice(gen, chunk_size)))
+                if not chunk:
+                    return
+                for item in chunk:
+                    yield item
+        finally:
+            try:
+                if gen is not None:
+                    await loop.run_in_executor(thread, gen.close)
+            finally:
+                thread.shutdown(wait=False)
+
+# Singleton
+google_executor = GoogleApiExecutor(max_workers=config.settings.GOOGLE_API_THREADS)
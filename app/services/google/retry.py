@@ -0,0 +1,184 @@
+import json
+import logging
+import random
+import threading
+import time
+from app.core import config
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token (possibly going into debt) and returns how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+def error_reason(error) -> str | None:
+    try:
+        details = json.loads(error.content)['error']
+        return details['errors'][0]['reason']
+    except Exception:
+        return None
+
+def retry_after_seconds(error) -> float | None:
+    value = error.resp.get('retry-after') if error.resp is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def is_rate_limited(error) -> bool:
+    status = error.resp.status
+    return status == 429 or (status == 403 and error_reason(error) in RATE_LIMIT_REASONS)
+
+def is_retryable(error) -> bool:
+    return error.resp.status in RETRYABLE_STATUSES or is_rate_limited(error)
+
+# Google accepts at most 50 sub-requests per Calendar batch call
+BATCH_LIMIT = 50
+
+class GoogleRequestExecutor:
+    """
+    Runs googleapiclient requests under a per-API rate limit with retries.
+
+    Each API has a token bucket sized to our quota. Requests that fail with
+    429, 403 rate-limit reasons or 5xx are retried with exponential backoff
+    and full jitter, waiting at least as long as the server's Retry-After.
+    Non-idempotent requests (inserts) are only retried when rate limited: a
+    5xx or dropped connection may come after Google already created the item.
+    """
+
+    def __init__(self, rates: dict, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 32.0):
+        self.buckets = {api: TokenBucket(rate) for api, rate in rates.items()}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = time.sleep
+
+    def _metrics(self, api: str):
+        return (
+            metrics.summary(f"google_{api}_throttle_seconds", f"Time {api} requests waited for the rate limiter"),
+            metrics.counter(f"google_{api}_retries_total", f"{api} requests retried after a transient error"),
+            metrics.summary(f"google_{api}_backoff_seconds", f"Backoff delays before retrying {api} requests"),
+        )
+
+    def backoff_delay(self, attempt: int, error=None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def execute(self, request, api: str, idempotent: bool = True):
+        from googleapiclient.errors import HttpError
+
+        throttle, retries, backoff = self._metrics(api)
+        bucket = self.buckets.get(api)
+        attempt = 0
+        while True:
+            if bucket is not None:
+                throttle.observe(bucket.acquire())
+            try:
+                return request.execute()
+            except HttpError as e:
+                retryable = is_retryable(e) if idempotent else is_rate_limited(e)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                logger.warning(f"⏳ Google {api} API returned {e.resp.status}, retrying in {delay:.2f}s")
+            except (ConnectionError, TimeoutError) as e:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"⏳ Google {api} API connection error ({e}), retrying in {delay:.2f}s")
+
+            retries.inc()
+            backoff.observe(delay)
+            self.sleep(delay)
+            attempt += 1
+
+    def execute_batch(self, service, requests: list, api: str, idempotent: bool = True) -> list:
+        """
+        Sends `requests` as batch HTTP calls (BATCH_LIMIT per call) and returns
+        (response, error) pairs in the same order.
+
+        Only failed sub-requests are sent again, under the same rules as
+        execute(): non-idempotent ones only when rate limited. A batch call
+        that fails as a whole is reported as the error of its own requests.
+        """
+        from googleapiclient.errors import HttpError
+
+        throttle, retries, backoff = self._metrics(api)
+        bucket = self.buckets.get(api)
+        results = [(None, None)] * len(requests)
+        pending = list(range(len(requests)))
+        attempt = 0
+        while pending:
+            outcome = {}
+
+            def collect(request_id, response, exception):
+                outcome[int(request_id)] = (response, exception)
+
+            for start in range(0, len(pending), BATCH_LIMIT):
+                chunk = pending[start:start + BATCH_LIMIT]
+                batch = service.new_batch_http_request(callback=collect)
+                for index in chunk:
+                    # Every sub-request counts against the quota
+                    if bucket is not None:
+                        throttle.observe(bucket.acquire())
+                    batch.add(requests[index], request_id=str(index))
+                try:
+                    batch.execute()
+                except Exception as e:
+                    logger.error(f"Google {api} batch of {len(chunk)} failed: {e}")
+                    for index in chunk:
+                        outcome.setdefault(index, (None, e))
+
+            retry = []
+            for index in pending:
+                results[index] = outcome.get(index, (None, RuntimeError("No response in batch")))
+                error = results[index][1]
+                if not isinstance(error, HttpError) or attempt >= self.max_retries:
+                    continue
+                if is_retryable(error) if idempotent else is_rate_limited(error):
+                    retry.append(index)
+            if not retry:
+                break
+
+            delay = max(self.backoff_delay(attempt, results[i][1]) for i in retry)
+            logger.warning(f"⏳ Google {api} batch: retrying {len(retry)} of {len(pending)} requests in {delay:.2f}s")
+            retries.inc(len(retry))
+            backoff.observe(delay)
+            self.sleep(delay)
+            pending = retry
+            attempt += 1
+        return results
+
+# Singleton
+request_executor = GoogleRequestExecutor(
+    rates={'calendar': config.settings.CALENDAR_API_QPS, 'tasks': config.settings.TASKS_API_QPS},
+    max_retries=config.settings.GOOGLE_API_MAX_RETRIES
+)
@@ -1,88 +1,52 @@
-import os.path
-import json
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from app.core import config
+import threading
+from app.services.google.credentials import credential_manager, TASKS_SCOPES
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Scopes needed for Tasks
-SCOPES = ['https://www.googleapis.com/auth/tasks']
+SCOPES = TASKS_SCOPES
 
 class GoogleTasksClient:
-    def __init__(self):
+    def __init__(self, credentials=credential_manager):
+        # Authentication is deferred to the first get_service() call so that
+        # importing the app stays cheap (no token refresh or discovery parsing).
+        self.credentials = credentials
         self.creds = None
         self.service = None
-        self.authenticate()
+        # httplib2 is not thread-safe, so every worker thread gets its own service object
+        self._local = threading.local()
 
     def authenticate(self):
-        """Authenticates using existing token.json or credentials.json."""
-        creds_path = config.settings.GOOGLE_CREDENTIALS_PATH
-        token_path = config.settings.GOOGLE_TOKEN_PATH
-        creds_json = config.settings.GOOGLE_CREDENTIALS_JSON
-        token_json = config.settings.GOOGLE_TOKEN_JSON
-        
-        # 1. Load Client Info (Env Var OR File)
-        client_config = None
-        if creds_json:
-            try:
-                client_info = json.loads(creds_json)
-                client_config = client_info.get('installed') or client_info.get('web')
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse GOOGLE_CREDENTIALS_JSON: {e}")
-        elif os.path.exists(creds_path):
-             with open(creds_path, 'r') as f:
-                client_info = json.load(f)
-                client_config = client_info.get('installed') or client_info.get('web')
-        
-        if not client_config:
-            logger.warning("Tasks Credentials missing! Set GOOGLE_CREDENTIALS_JSON env var or mapped volume.")
-
-        # 2. Load Token Info (Env Var OR File)
-        token_info = None
-        if token_json:
-             try:
-                token_info = json.loads(token_json)
-             except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse GOOGLE_TOKEN_JSON: {e}")
-        elif os.path.exists(token_path):
-            with open(token_path, 'r') as f:
-                token_info = json.load(f)
-
-        if token_info:
-            try:
-                self.creds = Credentials.from_authorized_user_info(token_info, SCOPES)
-            except ValueError:
-                self.creds = None
-        
-        # If there are no (valid) credentials available, let the user log in.
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                try:
-                    self.creds.refresh(Request())
-                except Exception as e:
-                    logger.error(f"Failed to refresh tasks token: {e}")
-                    self.creds = None
-            else:
-                 if creds_json:
-                     logger.error("Tasks Token invalid/expired in Cloud Env.")
-                 else:
-                     logger.debug(f"Tasks Creds debugging info logged.")
+        """Fetches the shared credentials (loaded from the token store, env or token.json)."""
+        self.creds = self.credentials.get_credentials()
 
         if self.creds and self.creds.valid:
-            self.service = build('tasks', 'v1', credentials=self.creds)
+            self.service = self._build_service()
             logger.info("✅ Google Tasks Service initialized.")
         else:
+            # In Cloud Env, we cannot launch browser. Fail on use instead of crashing on start.
             logger.warning("❌ Google Tasks Service failed to initialize.")
 
+    def _build_service(self):
+        from googleapiclient.discovery import build
+
+        # Discovery document is loaded from the copy bundled with googleapiclient (no network fetch)
+        return build('tasks', 'v1', credentials=self.creds, static_discovery=True, cache_discovery=False)
+
     def get_service(self):
         if not self.service:
             self.authenticate()
             if not self.service:
                  raise Exception("Google Tasks Service is not authenticated.")
-        return self.service
+
+        # Refreshes the shared token ahead of expiry (no-op while it is fresh)
+        self.credentials.get_credentials()
+
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self._build_service()
+        return service
 
 # Singleton
 tasks_client = GoogleTasksClient()
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+
+# Partial-response masks: only what the bot and agents read is downloaded
+TASK_LIST_FIELDS = 'id,title'
+TASK_FIELDS = 'id,title,notes,due,status'
+
+@dataclass(frozen=True, slots=True)
+class TaskList:
+    id: str
+    title: str
+
+    @classmethod
+    def from_api(cls, item: dict) -> "TaskList":
+        return cls(id=item['id'], title=item.get('title', ''))
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    id: str
+    title: str
+    notes: str = ''
+    due: str | None = None
+    status: str = 'needsAction'
+
+    @classmethod
+    def from_api(cls, item: dict) -> "Task":
+        return cls(
+            id=item['id'],
+            title=item.get('title', ''),
+            notes=item.get('notes', ''),
+            due=item.get('due'),
+            status=item.get('status', 'needsAction'),
+        )
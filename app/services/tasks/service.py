@@ -1,30 +1,96 @@
 import datetime
+from app.core import config
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
 from app.services.tasks.client import tasks_client
+from app.services.tasks.models import Task, TaskList, TASK_FIELDS, TASK_LIST_FIELDS
+from app.services.google.executor import AsyncServiceFacade, google_executor
+from app.services.google.retry import request_executor
+
+task_lists_revalidated = metrics.counter("task_lists_revalidated_total", "Task list cache entries confirmed by 304 Not Modified")
 
 class TasksService:
     def __init__(self):
         self.client = tasks_client
+        self.task_lists_cache = TTLCache("task_lists", ttl=config.settings.TASK_LISTS_CACHE_TTL)
+
+    def _paginate(self, method, first_page_headers: dict = None, **params):
+        """Yields raw response pages of a list call, following nextPageToken lazily."""
+        page_token = None
+        while True:
+            request = method(pageToken=page_token, **params)
+            if first_page_headers and page_token is None:
+                request.headers.update(first_page_headers)
+            response = request_executor.execute(request, api='tasks')
+            yield response
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
 
-    def get_task_lists(self):
-        """Returns a list of all task lists."""
+    def iter_task_lists(self, page_size: int = 100):
+        """Streams every task list, one page at a time."""
         service = self.client.get_service()
-        
-        results = service.tasklists().list(maxResults=30).execute()
-        items = results.get('items', [])
-        return [{'id': item['id'], 'title': item['title']} for item in items]
+        pages = self._paginate(
+            service.tasklists().list, maxResults=page_size, fields=f'nextPageToken,items({TASK_LIST_FIELDS})'
+        )
+        for response in pages:
+            for item in response.get('items', []):
+                yield TaskList.from_api(item)
+
+    def get_task_lists(self) -> list[TaskList]:
+        """Returns a list of all task lists (cached, revalidated with the list ETag)."""
+        from googleapiclient.errors import HttpError
+
+        cached = self.task_lists_cache.get('lists')
+        if cached is not None:
+            return cached
 
-    def get_tasks(self, tasklist_id: str = '@default', show_completed: bool = False):
-        """Returns pending tasks from a specific list."""
         service = self.client.get_service()
-        
-        results = service.tasks().list(
+        stale = self.task_lists_cache.get_entry('lists')
+        headers = {'If-None-Match': stale.etag} if stale is not None and stale.etag else None
+
+        pages = self._paginate(
+            service.tasklists().list, first_page_headers=headers,
+            maxResults=100, fields=f'etag,nextPageToken,items({TASK_LIST_FIELDS})'
+        )
+        lists = []
+        etag = None
+        try:
+            for response in pages:
+                etag = etag or response.get('etag')
+                lists.extend(TaskList.from_api(item) for item in response.get('items', []))
+        except HttpError as e:
+            if e.resp.status == 304 and stale is not None:
+                task_lists_revalidated.inc()
+                self.task_lists_cache.touch('lists')
+                return stale.value
+            raise
+
+        self.task_lists_cache.set('lists', lists, etag=etag)
+        return lists
+
+    def invalidate_task_lists(self):
+        """Drops cached task lists so the next call fetches them from Google."""
+        self.task_lists_cache.invalidate()
+
+    def iter_tasks(self, tasklist_id: str = '@default', show_completed: bool = False, page_size: int = 100):
+        """Streams tasks from a specific list, fetching the next page only when needed."""
+        service = self.client.get_service()
+        pages = self._paginate(
+            service.tasks().list,
             tasklist=tasklist_id,
-            maxResults=50,
+            maxResults=page_size,
             showCompleted=show_completed,
-            showHidden=show_completed
-        ).execute()
-        
-        return results.get('items', [])
+            showHidden=show_completed,
+            fields=f'nextPageToken,items({TASK_FIELDS})'
+        )
+        for response in pages:
+            for item in response.get('items', []):
+                yield Task.from_api(item)
+
+    def get_tasks(self, tasklist_id: str = '@default', show_completed: bool = False) -> list[Task]:
+        """Returns all pending tasks from a specific list."""
+        return list(self.iter_tasks(tasklist_id, show_completed))
 
     def complete_task(self, task_id: str, tasklist_id: str = '@default'):
         """Marks a task as completed."""
@@ -35,16 +101,15 @@ class TasksService:
             'status': 'completed'
         }
         
-        service.tasks().update(
+        request = service.tasks().update(
             tasklist=tasklist_id,
             task=task_id,
             body=task
-        ).execute()
-
-    def create_task(self, title: str, notes: str = "", due: str = None, tasklist_id: str = '@default'):
-        """Creates a task in the specified list."""
-        service = self.client.get_service()
+        )
+        request_executor.execute(request, api='tasks')
 
+    @staticmethod
+    def _task_body(title: str, notes: str = "", due: str = None) -> dict:
         task = {
             'title': title,
             'notes': notes
@@ -57,9 +122,43 @@ class TasksService:
                      task['due'] = dt.isoformat() + 'Z'
             except:
                 pass
+        return task
 
-        result = service.tasks().insert(tasklist=tasklist_id, body=task).execute()
+    @staticmethod
+    def _task_link(result: dict) -> str:
         return result.get('webViewLink') or result.get('selfLink') or result.get('id')
 
+    def create_task(self, title: str, notes: str = "", due: str = None, tasklist_id: str = '@default'):
+        """Creates a task in the specified list."""
+        service = self.client.get_service()
+        task = self._task_body(title, notes, due)
+
+        result = request_executor.execute(service.tasks().insert(tasklist=tasklist_id, body=task, fields='id,webViewLink,selfLink'), api='tasks', idempotent=False)
+        return self._task_link(result)
+
+    def create_tasks(self, tasks: list[dict]) -> list:
+        """
+        Creates several tasks (create_task keyword dicts) in one batch request.
+        Returns (link, error) pairs in the same order.
+        """
+        service = self.client.get_service()
+        requests = [
+            service.tasks().insert(
+                tasklist=task.get('tasklist_id', '@default'),
+                body=self._task_body(task['title'], task.get('notes', ""), task.get('due')),
+                fields='id,webViewLink,selfLink'
+            )
+            for task in tasks
+        ]
+        return [
+            (self._task_link(response) if error is None else None, error)
+            for response, error in request_executor.execute_batch(service, requests, api='tasks', idempotent=False)
+        ]
+
 # Singleton
 tasks_service = TasksService()
+
+# Awaitable view for async handlers (runs on the Google API thread pool)
+async_tasks_service = AsyncServiceFacade(
+    tasks_service, google_executor, max_concurrency=config.settings.TASKS_MAX_CONCURRENCY
+)
@@ -0,0 +1,94 @@
+"""
+Benchmark for chunked parallel transcription of long voice notes.
+
+Starts a local stand-in for Groq's /audio/transcriptions endpoint whose
+latency grows with the audio length (fixed overhead + real-time factor, like
+Whisper), then transcribes synthetic speech-like notes (tone bursts separated
+by short pauses) of several lengths in one request and split at silences.
+Runs without ffmpeg: the notes are generated as PCM directly.
+
+Usage:
+    python scripts/benchmarks/bench_chunked_transcription.py [--lengths 30,60,120,300] [--overhead 0.3] [--rtf 0.03]
+"""
+import argparse
+import array
+import asyncio
+import io
+import math
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from aiohttp import web
+from app.core import config
+from app.services.ai.audio import SAMPLE_RATE, pcm_to_wav
+
+def synth_note(seconds: float) -> bytes:
+    """Bursts of 'speech' (2.5s) separated by 0.4s pauses, as 16-bit mono PCM."""
+    burst = array.array('h', (
+        int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE) * (0.6 + 0.4 * math.sin(2 * math.pi * 3 * i / SAMPLE_RATE)))
+        for i in range(int(2.5 * SAMPLE_RATE))
+    )).tobytes()
+    pause = bytes(int(0.4 * SAMPLE_RATE) * 2)
+    unit = burst + pause
+    total = int(seconds * SAMPLE_RATE) * 2
+    return (unit * (total // len(unit) + 1))[:total]
+
+def make_app(overhead: float, rtf: float) -> web.Application:
+    async def transcriptions(request: web.Request):
+        reader = await request.multipart()
+        duration = 0.0
+        async for part in reader:
+            if part.name == "file":
+                with wave.open(io.BytesIO(await part.read()), 'rb') as wav:
+                    duration = wav.getnframes() / wav.getframerate()
+        await asyncio.sleep(overhead + rtf * duration)
+        return web.json_response({"text": f"[{duration:.1f}s]"})
+
+    app = web.Application(client_max_size=100 * 1024 * 1024)
+    app.router.add_post("/openai/v1/audio/transcriptions", transcriptions)
+    return app
+
+async def run(lengths: list, overhead: float, rtf: float):
+    runner = web.AppRunner(make_app(overhead, rtf))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    config.settings.GROQ_API_KEY = config.settings.GROQ_API_KEY or "bench"
+    config.settings.GROQ_BASE_URL = f"http://127.0.0.1:{port}"
+    from app.services.ai.service import ai_service
+
+    print(f"🎙️ Stand-in Whisper: {overhead}s + {rtf}s per audio second; "
+          f"chunks ~{config.settings.VOICE_CHUNK_SECONDS}s, concurrency {config.settings.VOICE_CHUNK_CONCURRENCY}")
+    print(f"{'length':>8}{'chunks':>8}{'single':>10}{'chunked':>10}{'speedup':>9}")
+    try:
+        for seconds in lengths:
+            pcm = synth_note(seconds)
+
+            start = time.perf_counter()
+            await ai_service._transcribe_request("note.wav", pcm_to_wav(pcm))
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            text = await ai_service.transcribe_pcm(pcm)
+            chunked = time.perf_counter() - start
+
+            print(f"{seconds:>7}s{len(text.split()):>8}{single:>9.2f}s{chunked:>9.2f}s{single / chunked:>8.1f}x")
+    finally:
+        await runner.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", default="30,60,120,300", help="note lengths in seconds")
+    parser.add_argument("--overhead", type=float, default=0.3, help="stand-in latency per request (s)")
+    parser.add_argument("--rtf", type=float, default=0.03, help="stand-in latency per audio second (s)")
+    args = parser.parse_args()
+    asyncio.run(run([int(s) for s in args.lengths.split(",")], args.overhead, args.rtf))
+
+if __name__ == "__main__":
+    main()
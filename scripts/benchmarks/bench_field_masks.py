@@ -0,0 +1,98 @@
+"""
+Benchmark for partial-response field masks on calendar reads.
+
+Builds an events.list page shaped like Google's full event representation
+(attendees, conferenceData, etags, ...) and compares it with the page the
+EVENTS_LIST_FIELDS mask returns: payload size, JSON parse time and the time
+to turn the page into records.
+
+Usage:
+    python scripts/benchmarks/bench_field_masks.py [--events 500] [--iterations 50]
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.calendar.models import CalendarEvent, EVENT_FIELDS
+
+TZ = ZoneInfo("Asia/Dushanbe")
+
+def full_event(i: int) -> dict:
+    start = datetime.datetime(2025, 1, 6, 9, tzinfo=TZ) + datetime.timedelta(hours=3 * i)
+    end = start + datetime.timedelta(minutes=45)
+    attendees = [
+        {"email": f"person{j}@example.com", "displayName": f"Person {j}", "responseStatus": "accepted",
+         "optional": j % 3 == 0, "organizer": j == 0, "self": j == 1}
+        for j in range(6)
+    ]
+    return {
+        "kind": "calendar#event",
+        "etag": f"\"33{i:08d}000000\"",
+        "id": f"evt{i:06d}abcdefghijklmnop",
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid=ZXZ0{i:06d}",
+        "created": "2024-12-01T10:00:00.000Z",
+        "updated": "2024-12-20T12:34:56.789Z",
+        "summary": f"Team sync #{i}",
+        "description": "Weekly sync to go over the backend roadmap, open incidents and release planning. " * 3,
+        "location": "Meeting room 4 / Online",
+        "creator": {"email": "owner@example.com", "self": True},
+        "organizer": {"email": "owner@example.com", "self": True},
+        "start": {"dateTime": start.isoformat(), "timeZone": "Asia/Dushanbe"},
+        "end": {"dateTime": end.isoformat(), "timeZone": "Asia/Dushanbe"},
+        "iCalUID": f"evt{i:06d}@google.com",
+        "sequence": 2,
+        "attendees": attendees,
+        "hangoutLink": f"https://meet.google.com/abc-{i:04d}-xyz",
+        "conferenceData": {
+            "entryPoints": [
+                {"entryPointType": "video", "uri": f"https://meet.google.com/abc-{i:04d}-xyz", "label": "meet.google.com"},
+                {"entryPointType": "phone", "uri": "tel:+1-555-0100", "label": "+1 555-0100", "pin": "123456"},
+            ],
+            "conferenceSolution": {"key": {"type": "hangoutsMeet"}, "name": "Google Meet",
+                                   "iconUri": "https://fonts.gstatic.com/s/i/productlogos/meet_2020q4/v6/web-512dp/logo_meet_2020q4_color_2x_web_512dp.png"},
+            "conferenceId": f"abc-{i:04d}-xyz",
+        },
+        "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+
+def masked(event: dict) -> dict:
+    """What the server returns for the EVENT_FIELDS mask."""
+    return {key: event[key] for key in EVENT_FIELDS.split(',') if key in event}
+
+def time_it(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    events = [full_event(i) for i in range(args.events)]
+    full_body = json.dumps({"kind": "calendar#events", "items": events}).encode()
+    masked_body = json.dumps({"items": [masked(e) for e in events]}).encode()
+
+    full_parse = time_it(lambda: json.loads(full_body), args.iterations)
+    masked_parse = time_it(lambda: json.loads(masked_body), args.iterations)
+    full_records = time_it(lambda: [CalendarEvent.from_api(e, TZ) for e in json.loads(full_body)["items"]], args.iterations)
+    masked_records = time_it(lambda: [CalendarEvent.from_api(e, TZ) for e in json.loads(masked_body)["items"]], args.iterations)
+
+    print(f"📦 {args.events} events")
+    print(f"{'':<10}{'payload':>12}{'json parse':>14}{'parse+records':>16}")
+    print(f"{'full':<10}{len(full_body) / 1024:>10.1f}KB{full_parse * 1e3:>12.2f}ms{full_records * 1e3:>14.2f}ms")
+    print(f"{'masked':<10}{len(masked_body) / 1024:>10.1f}KB{masked_parse * 1e3:>12.2f}ms{masked_records * 1e3:>14.2f}ms")
+    print(f"🚀 Payload {len(full_body) / len(masked_body):.1f}x smaller, parse {full_parse / masked_parse:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark for the rule-based fast-path parser.
+
+Runs every phrase of the labeled corpus (data/parse_corpus.jsonl, resolved
+against a fixed "now") through parse_locally and reports how many it answers
+on its own, how accurate those answers are and how long they take. With
+--llm the same corpus also goes through the Groq prompt (needs GROQ_API_KEY).
+
+Usage:
+    python scripts/benchmarks/bench_local_parser.py [--llm] [--verbose]
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core import config
+from app.services.ai.local_parser import parse_locally
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "parse_corpus.jsonl")
+TZ_NAME = "Asia/Dushanbe"
+NOW = datetime.datetime(2026, 3, 2, 11, 0, tzinfo=ZoneInfo(TZ_NAME))  # Monday
+
+def load_corpus() -> list:
+    with open(CORPUS) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def matches(result: dict | None, expected: dict) -> bool:
+    if not result:
+        return False
+    for key, value in expected.items():
+        actual = result.get(key)
+        if key in ('summary', 'title'):
+            if str(actual or '').strip().lower() != value.lower():
+                return False
+        elif key in ('start', 'end', 'due'):
+            # The LLM may add seconds, a zone or drop the time of a due date
+            if value is None:
+                if actual:
+                    return False
+            elif not actual or not str(actual).startswith(value[:16]):
+                return False
+        elif actual != value:
+            return False
+    return True
+
+def llm_parse(text: str) -> dict | None:
+    from app.services.ai.client import groq_client
+    from app.services.ai.prompts import PromptManager
+    from app.services.ai.router import normalize_intents
+
+    completion = groq_client.get_client().chat.completions.create(
+        messages=PromptManager.build_messages(text, TZ_NAME, None, now=NOW),
+        model=groq_client.text_model,
+        temperature=0.1,
+        response_format={"type": "json_object"},
+    )
+    items = normalize_intents(json.loads(completion.choices[0].message.content))
+    return items[0] if items else None
+
+def report(name: str, latencies: list, answered: int, correct: int, total: int):
+    print(f"{name:<8}{answered:>6}/{total:<4}{correct / max(answered, 1):>10.0%}"
+          f"{statistics.mean(latencies) * 1e3:>12.3f}ms{max(latencies) * 1e3:>12.3f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also run the corpus through Groq")
+    parser.add_argument("--verbose", action="store_true", help="print every local answer")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    threshold = config.settings.LOCAL_PARSER_MIN_CONFIDENCE
+
+    latencies, answered, correct = [], 0, 0
+    for item in corpus:
+        start = time.perf_counter()
+        local = parse_locally(item["text"], NOW)
+        latencies.append(time.perf_counter() - start)
+        confident = local is not None and local.confidence >= threshold
+        ok = confident and matches(local.result, item["expected"])
+        answered += confident
+        correct += ok
+        if args.verbose:
+            mark = "✅" if ok else ("❌" if confident else "↪️ ")
+            print(f"{mark} {item['text']!r}: {local.result if confident else 'LLM fallback'}")
+
+    print(f"📚 {len(corpus)} phrases, confidence threshold {threshold}")
+    print(f"{'path':<8}{'answered':>11}{'accuracy':>10}{'mean':>14}{'max':>14}")
+    report("local", latencies, answered, correct, len(corpus))
+
+    if args.llm:
+        llm_latencies, llm_correct = [], 0
+        for item in corpus:
+            start = time.perf_counter()
+            try:
+                result = llm_parse(item["text"])
+            except Exception as e:
+                print(f"⚠️ {item['text']!r}: {e}")
+                result = None
+            llm_latencies.append(time.perf_counter() - start)
+            llm_correct += matches(result, item["expected"])
+        report("llm", llm_latencies, len(corpus), llm_correct, len(corpus))
+        saved = answered * statistics.mean(llm_latencies)
+        print(f"🚀 Local path skips {answered / len(corpus):.0%} of LLM calls (~{saved:.1f}s saved on this corpus)")
+
+if __name__ == "__main__":
+    main()
@@ -29,7 +29,7 @@ async def test_flow():
     
     # 2. Parse Text
     try:
-        event_data = await ai_service.parse_event(test_text)
+        event_data = (await ai_service.parse_event(test_text) or [None])[0]
         if event_data and 'summary' in event_data and 'start' in event_data:
             print(f"✅ Groq Response: {event_data}")
         else:
@@ -62,7 +62,7 @@ async def test_flow():
     print(f"\n🧠 Testing Groq Parsing for Advanced: '{adv_text}'")
     
     try:
-        adv_event = await ai_service.parse_event(adv_text)
+        adv_event = (await ai_service.parse_event(adv_text))[0]
         print(f"✅ Groq Advanced Response: {adv_event}")
         
         if not adv_event.get('recurrence'):
@@ -95,7 +95,7 @@ async def test_flow():
     print(f"\n📝 Testing Google Tasks Parsing for: '{task_text}'")
     
     try:
-        task_data = await ai_service.parse_event(task_text)
+        task_data = (await ai_service.parse_event(task_text))[0]
         print(f"✅ Groq Task Response: {task_data}")
         
         if task_data.get('type') != 'task':
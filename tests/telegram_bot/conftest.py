@@ -0,0 +1,4 @@
+import os
+
+# Settings require a bot token at import time; unit tests never talk to Telegram.
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:TEST")
@@ -0,0 +1,59 @@
+import asyncio
+import datetime
+from zoneinfo import ZoneInfo
+from app.handlers.calendar import render_agenda
+from app.services.calendar.agenda import AgendaEngine, AgendaPage
+from app.services.calendar.models import CalendarEvent, CalendarInfo
+
+TZ = ZoneInfo("Asia/Dushanbe")
+
+def make_event(event_id, calendar_id, hours_from_now):
+    start = datetime.datetime.now(TZ) + datetime.timedelta(hours=hours_from_now)
+    return CalendarEvent(event_id, event_id, start, start + datetime.timedelta(minutes=30), calendar_id=calendar_id)
+
+class FakeStore:
+    def __init__(self, events):
+        self.events = events
+
+    def window(self, start, end):
+        return [e for e in self.events if e.end > start and e.start < end]
+
+class FakeCalendarService:
+    def __init__(self, stores):
+        self.stores = stores
+        self.synced = []
+
+    def get_sync_store(self, calendar_id):
+        return self.stores[calendar_id]
+
+    async def list_calendars(self):
+        return [CalendarInfo('me@example.com', 'Me', primary=True), CalendarInfo('work', 'Work')]
+
+    async def sync_calendar(self, calendar_id):
+        self.synced.append(calendar_id)
+
+def test_agenda_merges_calendars_and_pages_from_cache():
+    service = FakeCalendarService({
+        'me@example.com': FakeStore([make_event('p1', 'me@example.com', 1), make_event('p2', 'me@example.com', 5)]),
+        'work': FakeStore([make_event('w1', 'work', 2), make_event('w2', 'work', 3)]),
+    })
+    engine = AgendaEngine(service, service, page_size=3)
+
+    async def run():
+        first = await engine.get_page('week', 0, refresh=True)
+        second = await engine.get_page('week', 1)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [e.id for e in first.events] == ['p1', 'w1', 'w2']
+    assert [e.id for e in second.events] == ['p2']
+    assert first.total_pages == 2
+    assert first.calendar_names == {'work': 'Work'}
+    # The second page came from the cached snapshot
+    assert service.synced == ['me@example.com', 'work']
+
+def test_event_titles_and_calendar_names_are_escaped():
+    event = make_event('<b>Q&A</b>', 'team', 1)
+    page = AgendaPage('today', 0, 1, [event], {'team': 'R&D <core>'})
+    text = render_agenda(page)
+    assert "&lt;b&gt;Q&amp;A&lt;/b&gt;" in text and "R&amp;D &lt;core&gt;" in text
@@ -0,0 +1,52 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+from app.core import config
+from app.services.ai.cache import ParseResponseCache, SqliteResponseStore, is_cacheable, make_key
+from app.services.ai.service import AIService
+from app.services.tasks.models import TaskList
+
+LISTS = [TaskList(id="a", title="Inbox"), TaskList(id="b", title="FinLivo")]
+NOW = datetime.datetime(2026, 3, 2, 11, 5)
+
+def test_key_normalizes_text_and_includes_context():
+    key = make_key("Standup tomorrow 10am", "Asia/Dushanbe", LISTS, now=NOW)
+    assert key == make_key("  standup   TOMORROW 10am. ", "Asia/Dushanbe", list(reversed(LISTS)), now=NOW.replace(minute=50))
+    assert key != make_key("standup tomorrow 10am", "Asia/Dushanbe", LISTS, now=NOW + datetime.timedelta(days=1))
+    assert key != make_key("standup tomorrow 10am", "Asia/Dushanbe", LISTS[:1], now=NOW)
+    # "at 5" means something else at 16:00 than at 11:00
+    assert make_key("gym at 5", "Asia/Dushanbe", LISTS, now=NOW) != make_key("gym at 5", "Asia/Dushanbe", LISTS, now=NOW.replace(hour=16))
+
+def test_time_relative_texts_are_not_cached():
+    assert is_cacheable("gym tonight")
+    assert not is_cacheable("call mom in 2 hours")
+    assert not is_cacheable("Remind me in half an hour")
+
+def test_sqlite_store_survives_restart(tmp_path):
+    path = str(tmp_path / "ai_cache.db")
+    ParseResponseCache(ttl=60, store=SqliteResponseStore(path)).set("k", [{"type": "task", "title": "Buy milk"}], 1.5)
+
+    cache = ParseResponseCache(ttl=60, store=SqliteResponseStore(path))
+    assert cache.get("k") == [{"type": "task", "title": "Buy milk"}]
+    assert cache.get("missing") is None
+
+def test_parse_event_serves_repeats_from_cache(monkeypatch):
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    calls = []
+
+    async def chat(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content='{"type": "task", "title": "Buy milk"}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    service = AIService()
+    service.wrapper = SimpleNamespace(chat=chat, text_model="test")
+    service.cache = ParseResponseCache(ttl=60)
+
+    async def run():
+        first = await service.parse_event("Buy milk", task_lists=LISTS)
+        first[0]["title"] = "edited by caller"
+        return await service.parse_event("buy  milk!", task_lists=LISTS)
+
+    assert asyncio.run(run()) == [{"type": "task", "title": "Buy milk"}]
+    assert len(calls) == 1
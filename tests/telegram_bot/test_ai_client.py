@@ -0,0 +1,156 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+import pytest
+from app.core import config
+from app.services.ai.client import GroqClientWrapper
+from app.services.ai.key_pool import ApiKeyPool, ApiKeyState
+from app.services.ai.service import AIService, SupersededError
+
+class FakeCompletions:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        message = SimpleNamespace(content=json.dumps({"type": "task", "title": kwargs["messages"][0]["content"][-5:]}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class FakeRawResponse:
+    def __init__(self, value, headers=None):
+        self.value = value
+        self.headers = headers or {}
+
+    async def parse(self):
+        return self.value
+
+def fake_client(completions):
+    async def create(**kwargs):
+        return FakeRawResponse(await completions.create(**kwargs))
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=create))))
+
+def make_wrapper(completions, max_concurrency=2, timeout=1.0):
+    wrapper = GroqClientWrapper()
+    wrapper._semaphore = asyncio.Semaphore(max_concurrency)
+    wrapper.timeout = timeout
+    wrapper.key_pool = ApiKeyPool([ApiKeyState("key#1", fake_client(completions))])
+    return wrapper
+
+def test_chat_respects_concurrency_limit():
+    completions = FakeCompletions()
+    wrapper = make_wrapper(completions, max_concurrency=2)
+
+    async def run():
+        await asyncio.gather(*(wrapper.chat(messages=[{"content": str(i)}]) for i in range(6)))
+
+    asyncio.run(run())
+    assert completions.max_active == 2
+    assert wrapper._inflight == 0
+
+def test_chat_times_out():
+    wrapper = make_wrapper(FakeCompletions(delay=1.0), timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(wrapper.chat(messages=[{"content": "x"}]))
+
+def test_new_message_supersedes_pending_request(monkeypatch):
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    service = AIService()
+    service.wrapper = make_wrapper(FakeCompletions(delay=0.2))
+
+    async def run():
+        first = asyncio.create_task(service.parse_event("first", user_id=1))
+        await asyncio.sleep(0.01)
+        assert service.cancel(1)
+        with pytest.raises(SupersededError):
+            await first
+        # The newer request still goes through
+        return await service.parse_event("second", user_id=1)
+
+    assert asyncio.run(run())[0]["type"] == "task"
+    assert service._inflight == {}
+
+def test_voice_transcription_overlaps_task_list_fetch(monkeypatch):
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    service = AIService()
+    seen = {}
+    steps = []
+
+    async def transcribe(file, **kwargs):
+        seen["file"] = file
+        steps.append("transcribe started")
+        await asyncio.sleep(0.05)
+        steps.append("transcribe done")
+        return SimpleNamespace(text="buy milk")
+
+    async def parse_event(text, task_lists=None, user_id=None):
+        seen["lists"] = task_lists
+        return [{"type": "task", "title": text}]
+
+    async def fetch_lists():
+        steps.append("lists started")
+        await asyncio.sleep(0.05)
+        return ["inbox"]
+
+    service.wrapper = SimpleNamespace(transcribe=transcribe, audio_model="whisper")
+    service.parse_event = parse_event
+
+    async def run():
+        return await service.parse_audio(io.BytesIO(b"OggS"), task_lists=asyncio.create_task(fetch_lists()))
+
+    assert asyncio.run(run()) == [{"type": "task", "title": "buy milk"}]
+    assert seen == {"file": ("voice.ogg", b"OggS"), "lists": ["inbox"]}
+    # The list fetch ran while Whisper was still transcribing
+    assert steps.index("lists started") < steps.index("transcribe done")
+
+def test_identical_concurrent_requests_share_one_call(monkeypatch):
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    completions = FakeCompletions(delay=0.1)
+    service = AIService()
+    service.wrapper = make_wrapper(completions)
+    saved = service.flights.saved.value
+
+    async def run():
+        first = asyncio.create_task(service.parse_event("Quarterly planning offsite", user_id=1))
+        second = asyncio.create_task(service.parse_event("Quarterly planning offsite", user_id=2))
+        await asyncio.sleep(0.02)
+        # The first sender moves on; the shared call keeps going for the second
+        service.cancel(1)
+        with pytest.raises(SupersededError):
+            await first
+        return await second
+
+    result = asyncio.run(run())
+    assert result[0]["type"] == "task"
+    assert completions.calls == 1
+    assert service.flights.saved.value == saved + 1
+    assert len(service.flights) == 0
+
+def test_same_user_sending_the_same_text_twice_shares_one_call(monkeypatch):
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    completions = FakeCompletions(delay=0.1)
+    service = AIService()
+    service.wrapper = make_wrapper(completions)
+
+    async def run():
+        first = asyncio.create_task(service.parse_event("Quarterly planning offsite", user_id=1))
+        await asyncio.sleep(0.02)
+        # Double-send (or forward to a second chat): the webhook must not supersede the first
+        assert not service.cancel(1, "quarterly planning  offsite")
+        second = asyncio.create_task(service.parse_event("Quarterly planning offsite", user_id=1))
+        return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert completions.calls == 1
+    assert service._inflight == {}
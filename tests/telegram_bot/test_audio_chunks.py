@@ -0,0 +1,58 @@
+import array
+import asyncio
+import io
+import wave
+from types import SimpleNamespace
+from app.core import config
+from app.services.ai.audio import SAMPLE_RATE, pcm_to_wav, split_on_silence
+from app.services.ai.service import AIService
+
+def tone(seconds: float) -> bytes:
+    return array.array('h', [4000, -4000] * int(seconds * SAMPLE_RATE / 2)).tobytes()
+
+def silence(seconds: float) -> bytes:
+    return bytes(int(seconds * SAMPLE_RATE) * 2)
+
+def test_split_cuts_at_silence_and_keeps_all_audio():
+    # Pauses at 8s and 17s; chunks should end there, not at exactly 6s/12s
+    pcm = tone(8) + silence(0.5) + tone(8.5) + silence(0.5) + tone(5)
+    chunks = split_on_silence(pcm, target_seconds=6, max_seconds=10)
+
+    assert b"".join(chunks) == pcm
+    durations = [len(c) / 2 / SAMPLE_RATE for c in chunks]
+    assert len(chunks) == 3
+    assert 8.0 <= durations[0] <= 8.5
+    assert 8.5 <= durations[1] <= 9.5
+
+def test_short_audio_is_not_split():
+    pcm = tone(5)
+    assert split_on_silence(pcm, target_seconds=6, max_seconds=10) == [pcm]
+
+def test_chunks_are_transcribed_in_parallel_and_stitched_in_order(monkeypatch):
+    monkeypatch.setattr(config.settings, "VOICE_CHUNK_SECONDS", 6)
+    monkeypatch.setattr(config.settings, "VOICE_CHUNK_MAX_SECONDS", 10)
+    active = {"now": 0, "max": 0}
+
+    async def transcribe(file, **kwargs):
+        name, data = file
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            seconds = wav.getnframes() / wav.getframerate()
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        # Later chunks finish first
+        await asyncio.sleep(0.05 if name == "chunk_0.wav" else 0.01)
+        active["now"] -= 1
+        return SimpleNamespace(text=f"{name}:{round(seconds)}")
+
+    service = AIService()
+    service.wrapper = SimpleNamespace(transcribe=transcribe, audio_model="whisper")
+    pcm = tone(8) + silence(0.5) + tone(8.5) + silence(0.5) + tone(5)
+
+    text = asyncio.run(service.transcribe_pcm(pcm))
+    assert text.split() == ["chunk_0.wav:8", "chunk_1.wav:9", "chunk_2.wav:6"]
+    assert active["max"] == 3
+
+def test_wav_wrapper_round_trips():
+    pcm = tone(1)
+    with wave.open(io.BytesIO(pcm_to_wav(pcm)), 'rb') as wav:
+        assert (wav.getnchannels(), wav.getframerate(), wav.readframes(wav.getnframes())) == (1, SAMPLE_RATE, pcm)
@@ -0,0 +1,111 @@
+import datetime
+import httplib2
+from googleapiclient.errors import HttpError
+from app.services.calendar.sync import CalendarSyncStore
+
+NOW = datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+
+def event(event_id, hour, summary=None, status="confirmed", days=0):
+    start = NOW + datetime.timedelta(days=days, hours=hour)
+    return {
+        "id": event_id,
+        "status": status,
+        "summary": summary or event_id,
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + datetime.timedelta(hours=1)).isoformat()},
+    }
+
+class FakeEventsApi:
+    """Serves scripted events.list responses keyed by (syncToken, pageToken)."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        key = (params.get("syncToken"), params.get("pageToken"))
+        api = self
+
+        class Request:
+            def execute(self):
+                page = api.pages[key]
+                if page == 410:
+                    raise HttpError(httplib2.Response({"status": 410}), b"")
+                return page
+
+        return Request()
+
+class FakeClient:
+    def __init__(self, api):
+        self.api = api
+
+    def get_service(self):
+        return self.api
+
+def test_full_then_incremental_sync_with_paging():
+    api = FakeEventsApi({
+        (None, None): {"items": [event("b", 12), event("a", 9)], "nextPageToken": "p2"},
+        (None, "p2"): {"items": [event("c", 15)], "nextSyncToken": "s1"},
+        ("s1", None): {"items": [event("a", 9, status="cancelled"), event("d", 10)], "nextSyncToken": "s2"},
+    })
+    store = CalendarSyncStore(FakeClient(api))
+    store.clock = lambda: NOW
+
+    store.sync()
+    assert [e.id for e in store.upcoming(NOW)] == ["a", "b", "c"]
+    assert store.sync_token == "s1"
+    assert api.calls[0]["timeMax"] == (NOW + store.lookahead).isoformat()
+
+    store.sync()
+    assert [e.id for e in store.upcoming(NOW)] == ["d", "b", "c"]
+    assert store.sync_token == "s2"
+    assert "timeMin" not in api.calls[-1]
+
+def test_gone_sync_token_triggers_full_resync():
+    api = FakeEventsApi({
+        ("stale", None): 410,
+        (None, None): {"items": [event("x", 8)], "nextSyncToken": "fresh"},
+    })
+    store = CalendarSyncStore(FakeClient(api))
+    store.clock = lambda: NOW
+    store.sync_token, store.window_end = "stale", NOW + store.lookahead
+
+    store.sync()
+    assert store.sync_token == "fresh"
+    assert len(store) == 1
+
+def test_events_outside_the_window_are_dropped():
+    api = FakeEventsApi({
+        (None, None): {"items": [event("old", 9), event("soon", 9, days=5)], "nextSyncToken": "s1"},
+        ("s1", None): {"items": [event("far", 9, days=30)], "nextSyncToken": "s2"},
+        ("s2", None): {"items": [], "nextSyncToken": "s3"},
+    })
+    store = CalendarSyncStore(FakeClient(api), lookback_days=1, lookahead_days=20)
+    store.clock = lambda: NOW
+    store.sync()
+
+    # A change beyond the synced window is not kept
+    store.sync()
+    assert sorted(e.id for e in store.window(NOW, NOW + datetime.timedelta(days=60))) == ["old", "soon"]
+
+    # Two days later "old" has fallen out of the lookback
+    store.clock = lambda: NOW + datetime.timedelta(days=2)
+    store.sync()
+    assert len(store) == 1 and store.sync_token == "s3"
+
+def test_full_sync_runs_again_when_the_window_runs_out():
+    api = FakeEventsApi({
+        (None, None): {"items": [event("a", 9)], "nextSyncToken": "s1"},
+    })
+    store = CalendarSyncStore(FakeClient(api), lookahead_days=20)
+    store.clock = lambda: NOW
+    store.sync()
+
+    store.clock = lambda: NOW + datetime.timedelta(days=11)
+    store.sync()
+    assert [call.get("syncToken") for call in api.calls] == [None, None]
+    assert store.window_end == NOW + datetime.timedelta(days=31)
@@ -0,0 +1,56 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app import main
+from app.services.calendar.models import CalendarInfo
+from app.services.calendar.watch import watch_manager
+
+class PushStandIn:
+    """Posts notifications the way Google's push service does."""
+
+    def __init__(self, client: TestClient, token: str):
+        self.client = client
+        self.token = token
+        self.message_number = 0
+
+    def post(self, state: str, token: str = None):
+        self.message_number += 1
+        return self.client.post(main.config.settings.GOOGLE_PUSH_PATH, headers={
+            "X-Goog-Channel-ID": "channel-1",
+            "X-Goog-Channel-Token": token or self.token,
+            "X-Goog-Message-Number": str(self.message_number),
+            "X-Goog-Resource-ID": "resource-1",
+            "X-Goog-Resource-State": state,
+            "X-Goog-Resource-URI": "https://www.googleapis.com/calendar/v3/calendars/primary/events",
+        })
+
+def test_push_notifications_trigger_calendar_refresh(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(main, "refresh_calendar", lambda calendar_id: calendar_id)
+    monkeypatch.setattr(main, "run_in_background", refreshed.append)
+    monkeypatch.setattr(watch_manager, "secret", "shared-secret")
+    push = PushStandIn(TestClient(main.app), token="shared-secret:primary")
+
+    assert push.post("sync").status_code == 200
+    assert refreshed == []
+
+    assert push.post("exists").status_code == 200
+    assert refreshed == ["primary"]
+
+    assert push.post("exists", token="forged:primary").status_code == 200
+    assert refreshed == ["primary"]
+
+def test_notifications_are_rejected_without_a_secret(monkeypatch):
+    monkeypatch.setattr(watch_manager, "secret", None)
+    assert watch_manager.parse_notification({"X-Goog-Channel-Token": ":primary", "X-Goog-Resource-State": "exists"}) is None
+
+def test_every_agenda_calendar_is_watched_by_its_calendar_list_id(monkeypatch):
+    registered = []
+    async def list_calendars():
+        return [CalendarInfo('me@example.com', 'Me', primary=True), CalendarInfo('work', 'Work')]
+    monkeypatch.setattr(main.async_calendar_service, "list_calendars", list_calendars)
+    monkeypatch.setattr(watch_manager, "register", registered.append)
+    monkeypatch.setattr(watch_manager, "start_renewal", lambda executor: None)
+
+    asyncio.run(main.start_calendar_watch())
+    # Notifications then refresh the same sync stores the agenda reads
+    assert registered == ['me@example.com', 'work']
@@ -0,0 +1,80 @@
+import datetime
+import json
+import threading
+import time
+from app.services.google import credentials as credentials_module
+from app.services.google.credentials import CredentialManager, FileTokenStore, MemoryTokenStore
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+class FakeCreds:
+    def __init__(self, expiry):
+        self.expiry = expiry
+        self.refresh_token = "refresh"
+        self.token = "old"
+        self.refresh_calls = 0
+
+    @property
+    def valid(self):
+        return self.expiry > utcnow()
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        time.sleep(0.05)
+        self.token = f"new-{self.refresh_calls}"
+        self.expiry = utcnow() + datetime.timedelta(hours=1)
+
+    def to_json(self):
+        return f'{{"token": "{self.token}", "refresh_token": "refresh"}}'
+
+def make_manager(creds, store):
+    manager = CredentialManager(scopes=[], store=store, refresh_margin=300)
+    manager.creds = creds
+    return manager
+
+def test_concurrent_refreshes_are_single_flight_and_written_back():
+    store = MemoryTokenStore()
+    creds = FakeCreds(expiry=utcnow() + datetime.timedelta(seconds=60))
+    manager = make_manager(creds, store)
+
+    threads = [threading.Thread(target=manager.get_credentials) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert creds.refresh_calls == 1
+    assert store.load() == {"token": "new-1", "refresh_token": "refresh"}
+
+def test_fresh_token_is_not_refreshed():
+    creds = FakeCreds(expiry=utcnow() + datetime.timedelta(hours=1))
+    manager = make_manager(creds, MemoryTokenStore())
+    assert manager.get_credentials() is creds
+    assert creds.refresh_calls == 0
+    assert 0 < manager.seconds_until_refresh() <= 3600 - 300
+
+def test_later_token_of_the_same_grant_wins(tmp_path, monkeypatch):
+    env = {"token": "env", "refresh_token": "r", "expiry": "2026-10-18T10:00:00Z"}
+    stored = {"token": "stored", "refresh_token": "r", "expiry": "2026-10-18T11:00:00.123456Z"}
+    store = FileTokenStore(str(tmp_path / "token.json"))
+    store.save(stored)
+    manager = CredentialManager(scopes=[], store=store)
+
+    # Refreshed on an earlier start: the stored token is reused
+    monkeypatch.setattr(credentials_module.config.settings, "GOOGLE_TOKEN_JSON", json.dumps(env))
+    assert manager._load_token_info() == stored
+
+    # Re-authenticated: a new grant in GOOGLE_TOKEN_JSON wins
+    env.update(refresh_token="r2")
+    monkeypatch.setattr(credentials_module.config.settings, "GOOGLE_TOKEN_JSON", json.dumps(env))
+    assert manager._load_token_info() == env
+
+    monkeypatch.setattr(credentials_module.config.settings, "GOOGLE_TOKEN_JSON", None)
+    assert manager._load_token_info() == stored
+
+def test_refresh_keeps_the_scopes_the_token_was_granted():
+    info = {"refresh_token": "r", "client_id": "c", "client_secret": "s",
+            "scopes": ["https://www.googleapis.com/auth/calendar.events"]}
+    manager = CredentialManager(scopes=["https://www.googleapis.com/auth/calendar.freebusy"], store=MemoryTokenStore(info))
+    assert manager._load().scopes == info["scopes"]
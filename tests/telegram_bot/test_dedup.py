@@ -0,0 +1,48 @@
+import asyncio
+from app.core.dedup import MemoryDedupBackend, UpdateDeduplicator, duplicates_dropped
+
+class FakeSharedBackend:
+    def __init__(self):
+        self.keys = set()
+
+    async def add_if_new(self, key, ttl):
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+    async def discard(self, key):
+        self.keys.discard(key)
+
+def test_redelivered_update_is_dropped():
+    dedup = UpdateDeduplicator(ttl=60)
+    before = duplicates_dropped.value
+    assert not asyncio.run(dedup.is_duplicate(1))
+    assert asyncio.run(dedup.is_duplicate(1))
+    assert not asyncio.run(dedup.is_duplicate(2))
+    assert duplicates_dropped.value == before + 1
+
+def test_memory_backend_is_bounded_and_expires():
+    backend = MemoryDedupBackend(max_size=2)
+    assert backend.add_if_new("1", ttl=60)
+    assert backend.add_if_new("2", ttl=60)
+    assert backend.add_if_new("3", ttl=60)
+    assert len(backend) == 2
+    # Oldest key was evicted, so it counts as new again
+    assert backend.add_if_new("1", ttl=60)
+    assert backend.add_if_new("4", ttl=-1)
+    assert backend.add_if_new("4", ttl=60)
+
+def test_shared_backend_dedups_across_instances():
+    shared = FakeSharedBackend()
+    first = UpdateDeduplicator(ttl=60, shared_backend=shared)
+    second = UpdateDeduplicator(ttl=60, shared_backend=shared)
+    assert not asyncio.run(first.is_duplicate(10))
+    assert asyncio.run(second.is_duplicate(10))
+
+def test_forgotten_update_is_processed_when_redelivered():
+    shared = FakeSharedBackend()
+    dedup = UpdateDeduplicator(ttl=60, shared_backend=shared)
+    assert not asyncio.run(dedup.is_duplicate(20))
+    asyncio.run(dedup.forget(20))
+    assert not asyncio.run(dedup.is_duplicate(20))
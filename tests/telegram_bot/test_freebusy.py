@@ -0,0 +1,76 @@
+import datetime
+import threading
+from app.services.calendar.freebusy import FreeBusyCache, IntervalIndex
+
+UTC = datetime.timezone.utc
+
+def at(hour, minute=0):
+    return datetime.datetime(2030, 1, 1, hour, minute, tzinfo=UTC)
+
+def test_interval_index_merges_and_finds_overlaps():
+    index = IntervalIndex()
+    index.add(at(9), at(10))
+    index.add(at(13), at(14))
+    index.add(at(9, 30), at(11))
+    assert list(zip(index.starts, index.ends)) == [(at(9), at(11)), (at(13), at(14))]
+
+    assert index.overlapping(at(10, 30), at(13, 30)) == [(at(9), at(11)), (at(13), at(14))]
+    assert index.overlapping(at(11), at(13)) == []
+
+class FakeFreeBusyApi:
+    def __init__(self):
+        self.queries = 0
+        self.gate = None
+        self.started = threading.Event()
+
+    def get_service(self):
+        return self
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.queries += 1
+        api = self
+
+        class Request:
+            def execute(self):
+                api.started.set()
+                if api.gate is not None:
+                    api.gate.wait()
+                return {'calendars': {
+                    'primary': {'busy': [{'start': at(9).isoformat(), 'end': at(10).isoformat()}]},
+                    'work': {'busy': [{'start': at(15).isoformat(), 'end': at(16).isoformat()}]},
+                }}
+
+        return Request()
+
+def test_conflicts_are_answered_from_cache_and_updated_on_create():
+    api = FakeFreeBusyApi()
+    cache = FreeBusyCache(api, horizon_days=365 * 10)
+
+    assert cache.find_conflicts(1, ['primary', 'work'], at(9, 30), at(9, 45)) == [(at(9), at(10))]
+    assert cache.find_conflicts(1, ['primary', 'work'], at(12), at(13)) == []
+
+    cache.add_busy(1, at(12, 30), at(13, 30))
+    assert cache.find_conflicts(1, ['primary', 'work'], at(12), at(13)) == [(at(12, 30), at(13, 30))]
+    assert api.queries == 1
+
+def test_slow_query_does_not_block_other_users():
+    api = FakeFreeBusyApi()
+    slow = FreeBusyCache(api, horizon_days=365 * 10)
+    slow.find_conflicts(2, ['primary'], at(9), at(10))  # user 2 is cached
+
+    api.gate, api.started = threading.Event(), threading.Event()
+    thread = threading.Thread(target=slow.find_conflicts, args=(1, ['primary'], at(9), at(10)))
+    thread.start()
+    assert api.started.wait(1)
+    # While user 1's query is on the network, user 2 is served and add_busy goes through
+    assert slow.find_conflicts(2, ['primary'], at(9, 30), at(9, 45)) == [(at(9), at(10))]
+    slow.add_busy(2, at(12), at(13))
+    api.gate.set()
+    thread.join()
+
+    # The query raced with add_busy, so its result was not cached
+    assert 1 not in slow._entries
+    assert api.queries == 2
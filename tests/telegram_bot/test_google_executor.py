@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+from app.services.google.executor import AsyncServiceFacade, GoogleApiExecutor
+
+class BlockingService:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def slow_call(self, value):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return value * 2
+
+def test_facade_runs_off_loop_with_concurrency_limit():
+    service = BlockingService()
+    executor = GoogleApiExecutor(max_workers=8)
+
+    async def run():
+        facade = AsyncServiceFacade(service, executor, max_concurrency=2)
+        return await asyncio.gather(*(facade.slow_call(i) for i in range(6)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8, 10]
+    assert service.max_active == 2
+    assert all(name.startswith("google-api") for name in service.threads)
+    executor.shutdown()
+
+class PagingService:
+    def __init__(self):
+        self.threads = []
+
+    def iter_items(self, count):
+        try:
+            for i in range(count):
+                self.threads.append(threading.get_ident())
+                yield i
+        finally:
+            self.threads.append(threading.get_ident())
+
+def test_stream_advances_and_closes_the_generator_on_one_thread():
+    service = PagingService()
+    executor = GoogleApiExecutor(max_workers=8)
+
+    async def run():
+        facade = AsyncServiceFacade(service, executor, max_concurrency=2)
+        items = []
+        stream = facade.stream("iter_items", 10, chunk_size=2)
+        async for item in stream:
+            items.append(item)
+            if item == 6:
+                break
+        await stream.aclose()
+        return items
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4, 5, 6]
+    assert len(set(service.threads)) == 1 and len(service.threads) == 9
+    assert threading.get_ident() not in service.threads
+    executor.shutdown()
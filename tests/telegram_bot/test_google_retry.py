@@ -0,0 +1,116 @@
+import json
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from app.services.google import retry
+from app.services.google.retry import GoogleRequestExecutor, TokenBucket
+
+def http_error(status, reason=None, retry_after=None):
+    headers = {'status': status}
+    if retry_after is not None:
+        headers['retry-after'] = str(retry_after)
+    content = json.dumps({'error': {'errors': [{'reason': reason}]}}).encode() if reason else b''
+    return HttpError(httplib2.Response(headers), content)
+
+class ScriptedRequest:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+def make_executor(max_retries=3):
+    executor = GoogleRequestExecutor(rates={}, max_retries=max_retries)
+    executor.delays = []
+    executor.sleep = executor.delays.append
+    return executor
+
+def test_rate_limited_requests_are_retried_honoring_retry_after():
+    executor = make_executor()
+    request = ScriptedRequest(
+        http_error(429, retry_after=7),
+        http_error(403, reason='userRateLimitExceeded'),
+        http_error(503),
+        {'ok': True},
+    )
+    assert executor.execute(request, api='calendar') == {'ok': True}
+    assert request.calls == 4
+    assert executor.delays[0] >= 7
+
+def test_non_retryable_errors_and_exhausted_retries_raise():
+    executor = make_executor(max_retries=1)
+    with pytest.raises(HttpError):
+        executor.execute(ScriptedRequest(http_error(403, reason='forbidden')), api='tasks')
+    request = ScriptedRequest(http_error(500), http_error(500))
+    with pytest.raises(HttpError):
+        executor.execute(request, api='tasks')
+    assert request.calls == 2
+
+def test_inserts_are_only_retried_when_rate_limited():
+    executor = make_executor()
+    request = ScriptedRequest(http_error(429), {'id': 'a'})
+    assert executor.execute(request, api='tasks', idempotent=False) == {'id': 'a'}
+    # The insert may already have gone through; retrying could duplicate it
+    for error in (http_error(503), ConnectionError("reset")):
+        request = ScriptedRequest(error, {'id': 'b'})
+        with pytest.raises(type(error)):
+            executor.execute(request, api='tasks', idempotent=False)
+        assert request.calls == 1
+
+def test_token_bucket_spaces_out_bursts():
+    bucket = TokenBucket(rate=100, capacity=2)
+    waits = [bucket._reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert 0 < waits[2] < waits[3] <= 0.03
+
+class FakeBatch:
+    def __init__(self, callback, outcomes, sent):
+        self.callback = callback
+        self.outcomes = outcomes
+        self.sent = sent
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        self.sent.append([request for request, _ in self.requests])
+        if any(request == 'unreachable' for request, _ in self.requests):
+            raise ConnectionError("connection reset")
+        for request, request_id in self.requests:
+            outcome = self.outcomes[request].pop(0)
+            if isinstance(outcome, Exception):
+                self.callback(request_id, None, outcome)
+            else:
+                self.callback(request_id, outcome, None)
+
+def fake_batch_service(outcomes, sent):
+    return type('Service', (), {'new_batch_http_request': lambda self, callback: FakeBatch(callback, outcomes, sent)})()
+
+def test_batch_resends_only_the_failed_sub_requests():
+    executor = make_executor()
+    outcomes = {'a': [{'id': 'a'}], 'b': [http_error(503), {'id': 'b'}], 'c': [http_error(400)]}
+    sent = []
+
+    results = executor.execute_batch(fake_batch_service(outcomes, sent), ['a', 'b', 'c'], api='tasks')
+    assert sent == [['a', 'b', 'c'], ['b']]
+    assert [response for response, _ in results] == [{'id': 'a'}, {'id': 'b'}, None]
+    assert results[2][1].resp.status == 400
+    assert len(executor.delays) == 1
+
+def test_batch_inserts_resend_only_rate_limited_items_and_keep_earlier_batches(monkeypatch):
+    monkeypatch.setattr(retry, "BATCH_LIMIT", 2)
+    executor = make_executor()
+    outcomes = {'a': [http_error(429), {'id': 'a'}], 'b': [http_error(503)], 'unreachable': []}
+    sent = []
+
+    results = executor.execute_batch(fake_batch_service(outcomes, sent), ['a', 'b', 'unreachable'], api='tasks', idempotent=False)
+    assert sent == [['a', 'b'], ['unreachable'], ['a']]
+    assert results[0] == ({'id': 'a'}, None)
+    assert results[1][1].resp.status == 503
+    assert isinstance(results[2][1], ConnectionError)
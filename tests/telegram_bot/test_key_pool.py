@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import pytest
+from groq import APIConnectionError, RateLimitError
+from app.services.ai.client import GroqClientWrapper
+from app.services.ai.key_pool import ApiKeyPool, ApiKeyState, KeysExhaustedError, parse_reset_seconds
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def rate_limit_error(headers):
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions"))
+    return RateLimitError("rate limited", response=response, body=None)
+
+class FakeKeyClient:
+    """Answers with the given rate-limit headers, or raises the given error."""
+
+    def __init__(self, name, headers=None, error=None, fail_once=None):
+        self.name = name
+        self.headers = headers or {}
+        self.error = error
+        self.fail_once = fail_once
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create)))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.fail_once:
+            error, self.fail_once = self.fail_once, None
+            raise error
+        if self.error:
+            raise self.error
+        async def parse():
+            return self.name
+        return SimpleNamespace(headers=self.headers, parse=parse)
+
+def make_pool(*clients):
+    pool = ApiKeyPool([ApiKeyState(c.name, c) for c in clients])
+    pool.clock = FakeClock()
+    return pool
+
+def test_parse_reset_seconds():
+    assert parse_reset_seconds("7.66s") == pytest.approx(7.66)
+    assert parse_reset_seconds("2m59.56s") == pytest.approx(179.56)
+    assert parse_reset_seconds("120ms") == pytest.approx(0.12)
+    assert parse_reset_seconds("30") == 30
+    assert parse_reset_seconds(None) is None
+
+def test_calls_go_to_the_key_with_most_headroom():
+    a, b = FakeKeyClient("a"), FakeKeyClient("b")
+    pool = make_pool(a, b)
+    pool.update(pool.states[0], {
+        "x-ratelimit-limit-requests": "1000", "x-ratelimit-remaining-requests": "900", "x-ratelimit-reset-requests": "1m",
+        "x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "600", "x-ratelimit-reset-tokens": "10s",
+    })
+    pool.update(pool.states[1], {
+        "x-ratelimit-limit-requests": "1000", "x-ratelimit-remaining-requests": "500", "x-ratelimit-reset-requests": "1m",
+    })
+
+    # Key a is low on tokens (10%), key b has 50% of its requests left
+    state = pool.acquire()
+    assert state.name == "b"
+    pool.release(state)
+
+    # Once a's token window resets it is the better key again
+    pool.clock.now += 11
+    assert pool.acquire().name == "a"
+
+def test_rate_limited_key_is_paused_until_reset():
+    limited = FakeKeyClient("a", error=rate_limit_error({"retry-after": "20"}))
+    healthy = FakeKeyClient("b")
+    wrapper = GroqClientWrapper()
+    wrapper.key_pool = pool = make_pool(limited, healthy)
+
+    assert asyncio.run(wrapper.chat(model="m", messages=[])) == "b"
+    assert limited.calls == 1
+    assert pool.states[0].paused_until == pool.clock.now + 20
+
+    # While paused, a is not tried again
+    asyncio.run(wrapper.chat(model="m", messages=[]))
+    assert (limited.calls, healthy.calls) == (1, 2)
+
+def test_all_keys_paused():
+    pool = make_pool(FakeKeyClient("a"))
+    pool.pause(pool.states[0], {"x-ratelimit-reset-requests": "5s"})
+    with pytest.raises(KeysExhaustedError):
+        pool.acquire()
+
+def test_connection_error_is_retried_once():
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    flaky = FakeKeyClient("a", fail_once=APIConnectionError(request=request))
+    wrapper = GroqClientWrapper()
+    wrapper.key_pool = make_pool(flaky)
+
+    assert asyncio.run(wrapper.chat(model="m", messages=[])) == "a"
+    assert flaky.calls == 2
+
+def test_malformed_rate_limit_headers_are_ignored():
+    pool = make_pool(FakeKeyClient("a"))
+    pool.update(pool.states[0], {"x-ratelimit-remaining-requests": "n/a", "x-ratelimit-remaining-tokens": "50",
+                                 "x-ratelimit-limit-tokens": "?"})
+    assert pool.states[0].limits == {"tokens": (50.0, None, pool.clock.now)}
@@ -0,0 +1,54 @@
+import datetime
+from zoneinfo import ZoneInfo
+import pytest
+from app.services.ai.local_parser import parse_locally
+from app.services.tasks.models import TaskList
+
+NOW = datetime.datetime(2026, 3, 2, 11, 0, tzinfo=ZoneInfo("Asia/Dushanbe"))  # Monday
+
+def test_event_with_time_and_duration():
+    parsed = parse_locally("Lunch with Sarah tomorrow at 1pm for 2 hours", NOW)
+    assert parsed.confidence == 1.0
+    assert parsed.result == {
+        "type": "event",
+        "summary": "Lunch with Sarah",
+        "start": "2026-03-03T13:00:00",
+        "end": "2026-03-03T15:00:00",
+        "description": "",
+        "recurrence": [],
+        "reminders": {"useDefault": True},
+    }
+
+def test_task_with_day_is_due_that_morning():
+    parsed = parse_locally("Remind me to pay rent on friday", NOW)
+    assert parsed.confidence == 1.0
+    assert parsed.result == {"type": "task", "title": "Pay rent", "notes": "", "due": "2026-03-06T09:00:00", "list_id": "@default"}
+
+def test_plain_task():
+    assert parse_locally("Buy milk", NOW).result["due"] is None
+
+def test_tasks_are_left_to_the_llm_when_there_are_project_lists():
+    lists = [TaskList(id="a1", title="My Tasks"), TaskList(id="b2", title="FinLivo")]
+    assert parse_locally("Buy milk", NOW, lists[:1]).confidence == 1.0
+    assert parse_locally("Buy milk", NOW, lists).confidence < 0.8
+    # Events do not go to a list
+    assert parse_locally("Lunch with Sarah tomorrow at 1pm", NOW, lists).confidence == 1.0
+
+@pytest.mark.parametrize("text", [
+    "Meeting every monday at 10am",  # recurrence
+    "Pay bills by March 5",          # explicit calendar date
+    "dinner at 8",                   # am/pm guess, already past
+    "Project sync next tuesday",     # "next" is ambiguous
+])
+def test_ambiguous_phrases_have_low_confidence(text):
+    parsed = parse_locally(text, NOW)
+    assert parsed is None or parsed.confidence < 0.8
+
+@pytest.mark.parametrize("text", [
+    "call john in 2 hours", "Team meeting from 2pm to 4pm", "Can we move the demo?",
+    "Встреча завтра в 15:00",  # Russian: "tomorrow" is not understood
+    "Купить молоко",
+    "Мулоқот пагоҳ соати 10",  # Tajik
+])
+def test_unsupported_phrases_are_left_to_the_llm(text):
+    assert parse_locally(text, NOW) is None
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from app.core import config
+from app.services.ai.router import is_complex, normalize_intents, validate_parse
+from app.services.ai.service import AIService
+from app.services.tasks.models import TaskList
+
+EVENT = {"type": "event", "summary": "Standup", "start": "2026-03-03T10:00:00", "end": "2026-03-03T10:15:00"}
+
+def make_service(answers: dict, monkeypatch):
+    """AIService whose fake chat answers per model name; returns (service, models called)."""
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    called = []
+
+    async def chat(model, **kwargs):
+        called.append(model)
+        message = SimpleNamespace(content=answers[model])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    service = AIService()
+    service.wrapper = SimpleNamespace(chat=chat)
+    service.router.models = {"small": "small-model", "large": "large-model", "fallback": "large-model"}
+    return service, called
+
+def test_validate_parse():
+    lists = [TaskList(id="b2", title="FinLivo")]
+    assert validate_parse(EVENT)
+    assert not validate_parse({**EVENT, "end": "2026-03-03T09:00:00"})
+    assert not validate_parse({**EVENT, "start": "tomorrow 10am"})
+    assert validate_parse({"type": "task", "title": "Fix auth", "list_id": "b2"}, lists)
+    assert not validate_parse({"type": "task", "title": "Fix auth", "list_id": "made-up"}, lists)
+    assert not validate_parse({"type": "note", "title": "?"})
+
+def test_is_complex():
+    assert not is_complex("Standup with the backend team tomorrow at 10")
+    assert is_complex("Gym every monday and wednesday at 7")
+    assert is_complex("Move the demo. Then call Alex.")
+
+def test_simple_request_stays_on_small_model(monkeypatch):
+    service, called = make_service({"small-model": json.dumps(EVENT)}, monkeypatch)
+    assert asyncio.run(service.parse_event("Standup tomorrow at 10 with the team")) == [EVENT]
+    assert called == ["small-model"]
+
+@pytest.mark.parametrize("small_answer", ["not json", json.dumps({"type": "event", "summary": "Standup"})])
+def test_invalid_small_answer_escalates(small_answer, monkeypatch):
+    service, called = make_service({"small-model": small_answer, "large-model": json.dumps(EVENT)}, monkeypatch)
+    escalations = service.router.escalations.value
+
+    assert asyncio.run(service.parse_event("Standup tomorrow at 10 with the team")) == [EVENT]
+    assert called == ["small-model", "large-model"]
+    assert service.router.escalations.value == escalations + 1
+
+def test_complex_request_goes_straight_to_large_model(monkeypatch):
+    service, called = make_service({"large-model": json.dumps(EVENT)}, monkeypatch)
+    asyncio.run(service.parse_event("Standup every weekday at 10 except fridays"))
+    assert called == ["large-model"]
+
+def test_normalize_intents():
+    task = {"type": "task", "title": "Buy milk"}
+    assert normalize_intents({"items": [task, EVENT]}) == [task, EVENT]
+    assert normalize_intents(EVENT) == [EVENT]
+    assert normalize_intents({"items": []}) is None
+    assert normalize_intents(["not", "an", "object"]) is None
+
+def test_several_intents_come_back_as_a_list(monkeypatch):
+    answer = {"items": [{"type": "task", "title": "Buy milk"}, EVENT]}
+    service, called = make_service({"small-model": json.dumps(answer)}, monkeypatch)
+    assert asyncio.run(service.parse_event("buy milk, standup tomorrow at 10")) == answer["items"]
+    assert called == ["small-model"]
@@ -0,0 +1,93 @@
+import asyncio
+import datetime
+import pytest
+from app.handlers import tasks as handlers
+from app.services.ai.local_parser import parse_locally
+
+NOW = datetime.datetime(2026, 3, 2, 11, 0)
+ITEMS = [
+    {"type": "task", "title": "Buy milk"},
+    {"type": "event", "summary": "Team sync", "start": "2026-03-06T15:00:00", "end": "2026-03-06T16:00:00"},
+    {"type": "task", "title": "Call the bank", "due": "2026-03-03T09:00:00", "list_id": "b2"},
+]
+
+class Overlap:
+    """Counts how many fake round trips are in flight at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+class FakeBatchService:
+    """Records each batch call, which yields like a network round trip."""
+
+    def __init__(self, prefix, overlap=None):
+        self.prefix = prefix
+        self.overlap = overlap or Overlap()
+        self.batches = []
+
+    async def _batch(self, items):
+        self.batches.append(items)
+        self.overlap.active += 1
+        self.overlap.max_active = max(self.overlap.max_active, self.overlap.active)
+        await asyncio.sleep(0.01)
+        self.overlap.active -= 1
+        return [(f"{self.prefix}/{i}", None) for i in range(len(items))]
+
+    async def create_tasks(self, tasks):
+        return await self._batch(tasks)
+
+    async def create_events(self, events, user_id=None):
+        return await self._batch(events)
+
+def test_intents_are_created_with_one_concurrent_batch_per_api(monkeypatch):
+    overlap = Overlap()
+    tasks, calendar = FakeBatchService("tasks", overlap), FakeBatchService("calendar", overlap)
+    monkeypatch.setattr(handlers, "async_tasks_service", tasks)
+    monkeypatch.setattr(handlers, "async_calendar_service", calendar)
+
+    results = asyncio.run(handlers.create_intents(ITEMS, user_id=1))
+    assert overlap.max_active == 2
+
+    assert len(tasks.batches) == len(calendar.batches) == 1
+    assert [t["tasklist_id"] for t in tasks.batches[0]] == ["@default", "b2"]
+    assert calendar.batches[0][0]["start_time"] == datetime.datetime(2026, 3, 6, 15, 0)
+    assert [(item, link) for item, link, _ in results] == [
+        (ITEMS[0], "tasks/0"), (ITEMS[1], "calendar/0"), (ITEMS[2], "tasks/1")
+    ]
+    assert "Created 3/3 items" in handlers.format_created(results)
+
+def test_malformed_intent_fails_alone(monkeypatch):
+    tasks, calendar = FakeBatchService("tasks"), FakeBatchService("calendar")
+    monkeypatch.setattr(handlers, "async_tasks_service", tasks)
+    monkeypatch.setattr(handlers, "async_calendar_service", calendar)
+
+    results = asyncio.run(handlers.create_intents([ITEMS[0], {"type": "event", "summary": "?", "start": "soon"}]))
+    assert results[0][1] == "tasks/0" and results[1][2] is not None
+    assert calendar.batches == []
+
+@pytest.mark.parametrize("text", [
+    "buy milk, call the bank tomorrow",
+    "Buy milk and call the bank",
+    "Call mom tomorrow and buy milk",
+    "Pay rent then email the landlord",
+    "Book flights also renew passport",
+])
+def test_local_parser_leaves_lists_of_things_to_the_llm(text):
+    local = parse_locally(text, NOW)
+    assert local is None or local.confidence < 0.8
+
+def test_one_action_with_a_joined_object_stays_local():
+    assert parse_locally("Buy milk and eggs", NOW).confidence == 1.0
+
+def test_one_api_failing_keeps_the_other_apis_results(monkeypatch):
+    class DownCalendar:
+        async def create_events(self, events, user_id=None):
+            raise ConnectionError("calendar down")
+
+    monkeypatch.setattr(handlers, "async_tasks_service", FakeBatchService("tasks"))
+    monkeypatch.setattr(handlers, "async_calendar_service", DownCalendar())
+    results = asyncio.run(handlers.create_intents(ITEMS))
+    assert [link for _, link, _ in results] == ["tasks/0", None, "tasks/1"]
+    assert isinstance(results[1][2], ConnectionError)
+    assert "Created 2/3 items" in handlers.format_created(results)
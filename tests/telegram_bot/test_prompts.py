@@ -0,0 +1,35 @@
+import datetime
+from app.services.ai.prompts import PromptManager, SYSTEM_PROMPT, estimate_tokens
+from app.services.tasks.models import TaskList
+
+LISTS = [
+    TaskList(id="a1", title="Inbox"),
+    TaskList(id="b2", title="FinLivo Backend"),
+    TaskList(id="c3", title="FinApp"),
+    TaskList(id="d4", title="SMS Gateway"),
+    TaskList(id="e5", title="Home"),
+]
+NOW = datetime.datetime(2026, 3, 2, 11, 0)
+
+# Token budgets: raise them deliberately, not by accident
+SYSTEM_PROMPT_BUDGET = 350
+USER_MESSAGE_BUDGET = 100
+
+def test_system_prompt_is_static():
+    first = PromptManager.build_messages("Buy milk", "Asia/Dushanbe", LISTS, NOW)
+    second = PromptManager.build_messages("Standup tomorrow 10am", "Europe/Berlin", LISTS[:1], NOW + datetime.timedelta(hours=5))
+    assert first[0] == second[0] == {"role": "system", "content": SYSTEM_PROMPT}
+
+def test_user_message_carries_request_context():
+    content = PromptManager.build_messages("Fix the auth bug", "Asia/Dushanbe", LISTS, NOW)[1]["content"]
+    assert content.splitlines() == [
+        "Now: 2026-03-02T11:00 Mon Asia/Dushanbe",
+        "Lists: a1=Inbox; b2=FinLivo Backend [backend,api,database,auth,python,server,livo,code]; "
+        "c3=FinApp [frontend,app,ui,client]; d4=SMS Gateway [message,gateway,tcell,distribution]; e5=Home",
+        "Text: Fix the auth bug",
+    ]
+
+def test_prompt_tokens_per_request_stay_within_budget():
+    messages = PromptManager.build_messages("Fix the auth bug in the api server tomorrow", "Asia/Dushanbe", LISTS, NOW)
+    assert estimate_tokens(messages[0]["content"]) <= SYSTEM_PROMPT_BUDGET
+    assert estimate_tokens(messages[1]["content"]) <= USER_MESSAGE_BUDGET
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from app.core import config
+from app.services.ai.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ResilientCaller
+from app.services.ai.service import AIService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_then_recovers_through_half_open():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    breaker.clock = clock = FakeClock()
+
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one trial at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.state_gauge.value == CLOSED
+
+def test_slow_call_is_hedged_and_the_faster_answer_wins():
+    caller = ResilientCaller(["large"], budget=5.0, hedge_min_delay=0.05)
+    wins = caller.hedge_wins.value
+    calls = []
+
+    async def request():
+        calls.append("sent")
+        if len(calls) == 1:
+            try:
+                # The original never answers on its own
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                calls.append("original cancelled")
+                raise
+        return "hedge"
+
+    assert asyncio.run(caller.call("large", request)) == "hedge"
+    assert calls == ["sent", "sent", "original cancelled"]
+    assert caller.hedge_wins.value == wins + 1
+
+def test_budget_exceeded_counts_as_failure_and_opens_breaker():
+    caller = ResilientCaller(["large"], budget=0.05, hedge_min_delay=1.0, failure_threshold=2)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await caller.call("large", hang)
+        with pytest.raises(CircuitOpenError):
+            await caller.call("large", hang)
+
+    asyncio.run(run())
+    assert caller.breakers["large"].state == OPEN
+    assert not caller.available("large")
+
+def make_service(answers: dict, monkeypatch):
+    monkeypatch.setattr(config.settings, "LOCAL_PARSER_ENABLED", False)
+    called = []
+
+    async def chat(model, **kwargs):
+        called.append(model)
+        answer = answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+    service = AIService()
+    service.wrapper = SimpleNamespace(chat=chat)
+    service.router.models = {"small": "small-model", "large": "large-model", "fallback": "fallback-model"}
+    return service, called
+
+def test_failing_large_model_falls_back_to_fallback_model(monkeypatch):
+    event = {"type": "event", "summary": "Offsite", "start": "2026-03-03T10:00:00", "end": "2026-03-03T18:00:00"}
+    service, called = make_service({
+        "large-model": ConnectionError("groq down"),
+        "fallback-model": json.dumps(event),
+    }, monkeypatch)
+
+    assert asyncio.run(service.parse_event("Offsite every friday except holidays")) == [event]
+    assert called == ["large-model", "fallback-model"]
+
+def test_local_parser_answers_when_every_model_fails(monkeypatch):
+    error = ConnectionError("groq down")
+    service, _ = make_service({"small-model": error, "large-model": error, "fallback-model": error}, monkeypatch)
+
+    # Below LOCAL_PARSER_MIN_CONFIDENCE, so normally left to the LLM
+    [result] = asyncio.run(service.parse_event("Review PR on monday", user_id=7))
+    assert result["type"] == "task" and result["title"] == "Review PR"
+    assert result["guessed"]
+
+    # A wild guess (confidence 0.3: "in 2 days" is not understood) is worse than asking again
+    assert asyncio.run(service.parse_event("Team sync in 2 days at 3pm", user_id=7)) is None
+
+def test_fallback_answer_must_validate_and_the_same_model_is_not_asked_twice(monkeypatch):
+    error = ConnectionError("groq down")
+    service, called = make_service({
+        "small-model": json.dumps({"type": "event", "summary": "Standup"}),
+        "large-model": error,
+        "fallback-model": json.dumps({"type": "event", "summary": "Standup"}),
+    }, monkeypatch)
+    service.router.models["fallback"] = "small-model"
+
+    asyncio.run(service._parse_event("Standup at 10", [], None))
+    assert called == ["small-model", "large-model"]
+
+    service.router.models["fallback"] = "fallback-model"
+    assert asyncio.run(service._parse_event("Standup at 10", [], None)) is None
+    assert called[-1] == "fallback-model"
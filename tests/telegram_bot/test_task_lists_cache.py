@@ -0,0 +1,96 @@
+import httplib2
+from googleapiclient.errors import HttpError
+from app.services.tasks.models import Task, TaskList
+from app.services.tasks.service import TasksService
+
+class FakeRequest:
+    def __init__(self, api):
+        self.api = api
+        self.headers = {}
+
+    def execute(self):
+        self.api.calls.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == self.api.etag:
+            raise HttpError(httplib2.Response({'status': 304}), b'')
+        return {'etag': self.api.etag, 'items': [{'id': 'a', 'title': 'FinLivo'}]}
+
+class FakeTasksApi:
+    def __init__(self):
+        self.etag = '"v1"'
+        self.calls = []
+
+    def tasklists(self):
+        return self
+
+    def list(self, **kwargs):
+        return FakeRequest(self)
+
+class FakeClient:
+    def __init__(self, api):
+        self.api = api
+
+    def get_service(self):
+        return self.api
+
+def make_service(ttl):
+    api = FakeTasksApi()
+    service = TasksService()
+    service.client = FakeClient(api)
+    service.task_lists_cache.ttl = ttl
+    return service, api
+
+def test_task_lists_are_served_from_cache():
+    service, api = make_service(ttl=60)
+    hits = service.task_lists_cache.hits.value
+    assert service.get_task_lists() == [TaskList(id='a', title='FinLivo')]
+    assert service.get_task_lists() == [TaskList(id='a', title='FinLivo')]
+    assert len(api.calls) == 1
+    assert service.task_lists_cache.hits.value == hits + 1
+
+def test_expired_lists_are_revalidated_with_etag():
+    service, api = make_service(ttl=-1)
+    first = service.get_task_lists()
+    second = service.get_task_lists()
+    assert second is first
+    assert api.calls == [{}, {'If-None-Match': '"v1"'}]
+
+def test_invalidate_forces_full_fetch():
+    service, api = make_service(ttl=60)
+    service.get_task_lists()
+    service.invalidate_task_lists()
+    service.get_task_lists()
+    assert api.calls == [{}, {}]
+
+class PagedTasksApi:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def tasks(self):
+        return self
+
+    def list(self, **params):
+        self.requested.append(params.get('pageToken'))
+        page = self.pages[params.get('pageToken')]
+
+        class Request:
+            headers = {}
+
+            def execute(self):
+                return page
+
+        return Request()
+
+def test_iter_tasks_follows_pages_lazily():
+    api = PagedTasksApi({
+        None: {'items': [{'id': '1'}, {'id': '2'}], 'nextPageToken': 'p2'},
+        'p2': {'items': [{'id': '3'}]},
+    })
+    service = TasksService()
+    service.client = FakeClient(api)
+
+    tasks = service.iter_tasks('list')
+    assert next(tasks) == Task(id='1', title='')
+    assert api.requested == [None]
+
+    assert [t.id for t in service.get_tasks('list')] == ['1', '2', '3']
@@ -0,0 +1,131 @@
+import asyncio
+from aiogram import types
+from app.core.worker_pool import UpdateWorkerPool
+
+def make_update(update_id: int, chat_id: int, text: str = None) -> types.Update:
+    return types.Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+            "text": text or f"msg {update_id}",
+        },
+    })
+
+class RecordingDispatcher:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.handled = []
+        self.active = 0
+        self.max_active = 0
+
+    async def feed_update(self, bot, update):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.handled.append((update.message.chat.id, update.update_id))
+        self.active -= 1
+
+def test_updates_of_one_chat_are_handled_in_order():
+    async def run():
+        dp = RecordingDispatcher()
+        pool = UpdateWorkerPool(dp, bot=None, workers=3)
+        pool.start()
+        for i in range(1, 11):
+            assert pool.submit(make_update(i, chat_id=42))
+        await pool.stop()
+        return dp.handled
+
+    handled = asyncio.run(run())
+    assert [uid for _, uid in handled] == list(range(1, 11))
+
+def test_different_chats_are_handled_in_parallel():
+    async def run():
+        dp = RecordingDispatcher(delay=0.05)
+        pool = UpdateWorkerPool(dp, bot=None, workers=2)
+        pool.start()
+        pool.submit(make_update(1, chat_id=1))
+        pool.submit(make_update(2, chat_id=2))
+        await pool.stop()
+        return dp.max_active
+
+    assert asyncio.run(run()) == 2
+
+def test_slow_chat_does_not_hold_up_chats_that_shared_its_worker():
+    class SlowChatDispatcher(RecordingDispatcher):
+        def __init__(self):
+            super().__init__()
+            self.release = asyncio.Event()
+
+        async def feed_update(self, bot, update):
+            if update.message.chat.id == 1:
+                await self.release.wait()
+            self.handled.append((update.message.chat.id, update.update_id))
+
+    async def run():
+        dp = SlowChatDispatcher()
+        pool = UpdateWorkerPool(dp, bot=None, workers=4)
+        pool.start()
+        pool.submit(make_update(1, chat_id=1))
+        pool.submit(make_update(2, chat_id=1))
+        # 5 % 4 == 1 % 4: chat 5 used to queue behind chat 1's slow parse
+        pool.submit(make_update(3, chat_id=5))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        handled_while_slow = list(dp.handled)
+        dp.release.set()
+        await pool.stop()
+        return handled_while_slow, dp.handled
+
+    handled_while_slow, handled = asyncio.run(run())
+    assert handled_while_slow == [(5, 3)]
+    assert handled == [(5, 3), (1, 1), (1, 2)]
+
+def test_full_queue_rejects_update():
+    async def run():
+        dp = RecordingDispatcher(delay=0.05)
+        pool = UpdateWorkerPool(dp, bot=None, workers=1, max_queue_size=1)
+        pool.start()
+        accepted = [pool.submit(make_update(i, chat_id=7)) for i in range(1, 4)]
+        await pool.stop()
+        return accepted
+
+    assert asyncio.run(run()) == [True, False, False]
+
+def test_webhook_asks_telegram_to_retry_when_the_queue_is_full(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.core.dedup import UpdateDeduplicator
+
+    monkeypatch.setattr(main, "deduplicator", UpdateDeduplicator(ttl=60))
+    offered = []
+
+    def submit(update):
+        # Queue is full the first time only
+        offered.append(update)
+        return len(offered) > 1
+
+    monkeypatch.setattr(main.worker_pool, "submit", submit)
+    client = TestClient(main.app)
+    body = make_update(501, 1).model_dump_json()
+    assert client.post(main.config.settings.WEBHOOK_PATH, content=body).status_code == 503
+    # The redelivery is not mistaken for a duplicate
+    assert client.post(main.config.settings.WEBHOOK_PATH, content=body).status_code == 200
+    assert len(offered) == 2
+
+def test_only_messages_for_the_llm_supersede_a_pending_parse(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.core.dedup import UpdateDeduplicator
+
+    cancelled = []
+    monkeypatch.setattr(main, "deduplicator", UpdateDeduplicator(ttl=60))
+    monkeypatch.setattr(main.worker_pool, "submit", lambda update: True)
+    monkeypatch.setattr(main.ai_service, "cancel", lambda user_id, *args: cancelled.append(user_id))
+    client = TestClient(main.app)
+
+    for update_id, text in enumerate(["📅 Agenda", "/start", "Standup tomorrow at 10"], start=600):
+        client.post(main.config.settings.WEBHOOK_PATH, content=make_update(update_id, 3, text).model_dump_json())
+    assert cancelled == [3]
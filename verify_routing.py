@@ -1,3 +1,4 @@
+import asyncio
 from app.services.tasks.service import tasks_service
 from app.services.ai.service import ai_service
 from app.core import config
@@ -13,7 +14,7 @@ async def test_routing():
         lists = tasks_service.get_task_lists()
         print(f"✅ Found {len(lists)} lists:")
         for l in lists:
-            print(f"   - {l['title']} (ID: {l['id']})")
+            print(f"   - {l.title} (ID: {l.id})")
     except Exception as e:
         print(f"❌ Failed to fetch lists: {e}")
         return
@@ -22,10 +23,13 @@ async def test_routing():
     text = "Fix authentication bug in the api"
     print(f"\n🧠 Asking AI Service: '{text}'...")
     
-    event_data = await ai_service.parse_event(text, task_lists=lists)
-    print(f"🤖 AI Response: {event_data}")
+    intents = await ai_service.parse_event(text, task_lists=lists)
+    print(f"🤖 AI Response: {intents}")
+    if not intents:
+        print("❌ AI Service returned nothing")
+        return
     
-    target_list_id = event_data.get('list_id')
+    target_list_id = intents[0].get('list_id')
     print(f"🎯 Target List ID: {target_list_id}")
 
     if target_list_id and target_list_id != '@default':